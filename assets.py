@@ -0,0 +1,49 @@
+from PIL import Image, ImageTk, ImageEnhance
+
+# Images used by the checkout screens: path -> display size
+CHECKOUT_ASSETS = {
+    "qrcode.jpg": (250, 200),
+    "cash.jpg": (250, 200),
+    "buymeacoffee.jpg": (400, 400)
+}
+
+# Payment buttons darken on hover; brightness used for that state
+HOVER_ASSETS = ("qrcode.jpg", "cash.jpg")
+DARKEN = 0.5
+
+
+class AssetCache:
+    # Decodes, resizes and pre-renders each image variant once; later requests just return
+    # the same object. PhotoImages need a Tk root, so create the cache after tk.Tk().
+    def __init__(self):
+        self.images = {}  # (path, size) -> resized PIL image, or None if it failed to load
+        self.photos = {}  # (path, size, brightness) -> ImageTk.PhotoImage
+
+    def image(self, path, size):
+        key = (path, size)
+        if key not in self.images:
+            try:
+                img = Image.open(path)
+                self.images[key] = img.resize(size, Image.Resampling.LANCZOS)
+            except Exception as e:
+                print(f"Error loading image {path}: {e}")
+                self.images[key] = None  # Don't retry a missing file on every scan
+        return self.images[key]
+
+    def photo(self, path, size, brightness=1.0):
+        key = (path, size, brightness)
+        if key not in self.photos:
+            img = self.image(path, size)
+            if img is None:
+                return None
+            if brightness != 1.0:
+                img = ImageEnhance.Brightness(img).enhance(brightness)
+            self.photos[key] = ImageTk.PhotoImage(img)
+        return self.photos[key]
+
+    def preload(self, assets=CHECKOUT_ASSETS, hover_assets=HOVER_ASSETS):
+        # Render every variant up front so hover, scan and click never decode or resize
+        for path, size in assets.items():
+            self.photo(path, size)
+            if path in hover_assets:
+                self.photo(path, size, DARKEN)
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import cv2
+import numpy as np
+from checkout_engine import CheckoutEngine, draw_detections
+from detection_cache import DetectionCache
+from roi import load_rois
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+# 'engine' is the whole process_batch() call per frame (trays, detection cache, model, pricing);
+# preprocess/inference/postprocess and pricing are the parts of it spent in the model and in
+# build_basket. total = decode + engine + drawing.
+STAGES = ('decode', 'preprocess', 'inference', 'postprocess', 'pricing', 'engine', 'drawing', 'total')
+SPEED_KEYS = ('preprocess', 'inference', 'postprocess')
+
+
+class Timed:
+    # Stands in for an engine attribute (the model, build_basket) and adds up the time spent
+    # in it, so the real engine code is timed without being re-implemented here
+    def __init__(self, func, keep=False):
+        self.func = func
+        self.keep = keep  # Also keep what it returned (the model's results, for their `speed`)
+        self.seconds = 0.0
+        self.returned = []
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.func(*args, **kwargs)
+        self.seconds += time.perf_counter() - start
+        if self.keep:
+            self.returned.extend(result)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.func, name)
+
+    def reset(self):
+        self.seconds = 0.0
+        self.returned = []
+
+
+def instrument(engine):
+    engine.model = Timed(engine.model, keep=True)
+    engine.build_basket = Timed(engine.build_basket)
+    return engine
+
+
+def peak_rss_mb():
+    # Peak resident memory of this process; ru_maxrss is KiB on Linux and bytes on macOS
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def iter_frames(source, loops=1):
+    # Yields (frame, decode seconds) from an image, a folder of images or a video file
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source)
+                       if name.lower().endswith(IMAGE_EXTS))
+    elif source.lower().endswith(IMAGE_EXTS):
+        paths = [source]
+    else:
+        paths = None
+
+    for _ in range(loops):
+        if paths is not None:
+            for path in paths:
+                start = time.perf_counter()
+                frame = cv2.imread(path)
+                if frame is None:
+                    raise ValueError(f"Could not read image: {path}")
+                yield frame, time.perf_counter() - start
+            continue
+
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {source}")
+        try:
+            while True:
+                start = time.perf_counter()
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield frame, time.perf_counter() - start
+        finally:
+            cap.release()
+
+
+def summarize(samples):
+    values = np.array(samples, dtype=np.float64) * 1000
+    return {
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max())
+    }
+
+
+def run_batch(engine, batch, times, draw=True):
+    # The batch goes through the engine's own process_batch(), trays and detection cache
+    # included; the Timed wrappers from instrument() split out the model and pricing time.
+    # Those are shared evenly over the frames of the batch (cache hits make some frames free).
+    engine.model.reset()
+    engine.build_basket.reset()
+    start = time.perf_counter()
+    baskets = engine.process_batch([frame for frame, _ in batch])
+    per_frame = (time.perf_counter() - start) / len(batch)
+
+    # Ultralytics reports its preprocess/inference/postprocess split per image, in ms
+    speed = {key: 0.0 for key in SPEED_KEYS}
+    for result in engine.model.returned:
+        for key, ms in (getattr(result, 'speed', None) or {}).items():
+            if key in speed:
+                speed[key] += ms / 1000 / len(batch)
+
+    for (frame, decode), basket in zip(batch, baskets):
+        drawing = time.perf_counter()
+        if draw:
+            for roi in engine.rois:
+                roi.draw(frame)
+            draw_detections(frame, basket['detections'])
+        drawn = time.perf_counter()
+
+        stages = dict(speed, decode=decode, pricing=engine.build_basket.seconds / len(batch),
+                      engine=per_frame, drawing=drawn - drawing)
+        stages['total'] = decode + per_frame + stages['drawing']
+        for name in STAGES:
+            times[name].append(stages[name])
+
+
+def run_benchmark(engine, source, loops=1, warmup=5, batch_size=1, max_frames=None, draw=True):
+    times = {name: [] for name in STAGES}
+    frames = iter_frames(source, loops)
+
+    # Warm the model up on the first frame without measuring it; the frame itself still counts
+    first = next(frames, None)
+    if first is None:
+        raise ValueError(f"No frames to benchmark in {source}")
+    for _ in range(warmup):
+        engine.model([first[0]], verbose=False)  # Straight to the model, so the cache stays cold
+    frames = itertools.chain([first], frames)
+
+    count = 0
+    batch = []
+    start = time.perf_counter()
+    for frame, decode in frames:
+        batch.append((frame, decode))
+        count += 1
+        if len(batch) == batch_size:
+            run_batch(engine, batch, times, draw)
+            batch = []
+        if max_frames is not None and count >= max_frames:
+            break
+    if batch:
+        run_batch(engine, batch, times, draw)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'frames': count,
+        'seconds': elapsed,
+        'throughput_fps': count / elapsed if elapsed > 0 else 0.0,
+        'stages': {name: summarize(samples) for name, samples in times.items()},
+        'memory': {'peak_rss_mb': peak_rss_mb()}
+    }
+    if engine.cache is not None:
+        report['cache'] = engine.cache.stats()
+    return report
+
+
+def compare(current, baseline, tolerance=0.10, min_delta_ms=0.5):
+    # Stages whose p50 or p95 got slower by more than `tolerance` compared to the baseline run;
+    # changes under `min_delta_ms` are timer noise on sub-millisecond stages and are ignored
+    regressions = []
+    for name, stats in current['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if not before:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            slower = stats[key] - before[key]
+            if slower > min_delta_ms and stats[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {before[key]:.2f} -> {stats[key]:.2f} ms")
+    if baseline.get('throughput_fps') and current['throughput_fps'] < baseline['throughput_fps'] * (1 - tolerance):
+        regressions.append(f"throughput: {baseline['throughput_fps']:.1f} -> {current['throughput_fps']:.1f} fps")
+    return regressions
+
+
+def print_report(report):
+    print(f"{report['frames']} frames in {report['seconds']:.2f} s ({report['throughput_fps']:.1f} fps), "
+          f"peak RSS {report['memory']['peak_rss_mb'] or 0:.0f} MB")
+    print(f"  {'stage':<12} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for name, stats in report['stages'].items():
+        print(f"  {name:<12} {stats['mean_ms']:8.2f} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f}")
+    if 'cache' in report:
+        print(f"  detection cache: {report['cache']}")
+
+
+if __name__ == "__main__":
+    # Example: python benchmark.py detected_photo_0.jpg --loops 50 --output bench.json --compare old.json
+    parser = argparse.ArgumentParser(description="Replay images or video through the detection-to-price pipeline")
+    parser.add_argument('source', nargs='?', default='detected_photo_0.jpg', help="image, image folder or video")
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--runtime', default='torch')
+    parser.add_argument('--precision', default='fp32')
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--loops', type=int, default=1, help="replay the source this many times")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--max-frames', type=int)
+    parser.add_argument('--no-draw', action='store_true')
+    parser.add_argument('--rois', help="JSON tray polygons (see roi.load_rois); only the trays are detected")
+    parser.add_argument('--cache', action='store_true', help="reuse baskets of near-identical frames")
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--compare', help="earlier JSON results; exit 1 on a regression")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    engine = instrument(CheckoutEngine(args.model, runtime=args.runtime, precision=args.precision,
+                                       batch_size=args.batch_size, rois=load_rois(args.rois) if args.rois else None,
+                                       cache=DetectionCache() if args.cache else None))
+    report = run_benchmark(engine, args.source, args.loops, args.warmup, args.batch_size, args.max_frames,
+                           not args.no_draw)
+    report['meta'] = {
+        'source': args.source,
+        'model': args.model,
+        'runtime': args.runtime,
+        'precision': args.precision,
+        'batch_size': args.batch_size,
+        'rois': args.rois,
+        'cache': args.cache,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'machine': platform.platform()
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}")
+        sys.exit(1 if regressions else 0)
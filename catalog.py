@@ -0,0 +1,158 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from decimal import Decimal, InvalidOperation
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')  # Total of an empty basket; sums start here so they stay Decimal
+
+
+def to_money(value):
+    # Exact two-decimal amount; str() first so floats like 0.1 don't bring their binary error along.
+    # NaN, infinities, negative amounts and fractions of a cent are refused, not rounded, so a bad
+    # catalog row fails the load (or the reload keeps the old prices)
+    try:
+        amount = Decimal(str(value).strip())
+        if not amount.is_finite() or amount < 0:
+            raise ValueError(f"Invalid price: {value!r}")
+        money = amount.quantize(CENT)
+    except InvalidOperation:
+        raise ValueError(f"Invalid price: {value!r}")
+    if money != amount:
+        raise ValueError(f"Price has fractions of a cent: {value!r}")
+    return money.copy_abs()  # -0 -> 0.00
+
+
+def load_csv(path):
+    # Header row with at least "name" and "price" columns; other columns (SKU, ...) are ignored
+    with open(path, newline='') as f:
+        return {row['name']: row['price'] for row in csv.DictReader(f) if row.get('name')}
+
+
+def load_json(path):
+    # Either {"apple": "1.00", ...} or [{"name": "apple", "price": "1.00"}, ...]
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data
+    return {item['name']: item['price'] for item in data}
+
+
+def load_sqlite(path, table='prices'):
+    # Read-only so a price manager can keep writing to the database while we read it
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute(f"SELECT name, price FROM {table}"))
+    finally:
+        conn.close()
+
+
+LOADERS = {
+    '.csv': load_csv,
+    '.json': load_json,
+    '.db': load_sqlite,
+    '.sqlite': load_sqlite,
+    '.sqlite3': load_sqlite
+}
+
+
+class CompiledPrices:
+    # Prices laid out by model class id for one catalog version. Never modified after it is
+    # built, so a basket priced with it can't see half of a reload.
+    def __init__(self, class_names, prices, version):
+        self.version = version
+        self.class_names = list(class_names)
+        self.class_prices = [prices.get(name.lower()) for name in self.class_names]
+        self.priced = np.array([price is not None for price in self.class_prices], dtype=bool)
+
+
+class PriceCatalog:
+    # Item name -> exact Decimal price, loaded from a dict or a CSV/JSON/SQLite file.
+    # A file-backed catalog hot-reloads: maybe_reload() checks the file's mtime at most every
+    # `check_interval` seconds and swaps in the new prices in one step once they have loaded.
+    def __init__(self, source, check_interval=1.0, table='prices'):
+        self.path = None if isinstance(source, dict) else os.fspath(source)
+        self.table = table
+        self.check_interval = check_interval
+        self.version = 0
+        self.mtime = None
+        self.next_check = 0.0
+        self.lock = threading.Lock()
+
+        if self.path is None:
+            self.prices = self.normalize(source)
+        else:
+            self.prices = self.normalize(self.read())
+
+    def __getstate__(self):
+        # Picklable for the worker processes, which reload from the same file on their own
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def normalize(self, raw):
+        return {str(name).strip().lower(): to_money(price) for name, price in raw.items()}
+
+    def read(self):
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext not in LOADERS:
+            raise ValueError(f"Unsupported catalog format: {self.path}")
+        self.mtime = os.stat(self.path).st_mtime_ns
+        if LOADERS[ext] is load_sqlite:
+            return load_sqlite(self.path, self.table)
+        return LOADERS[ext](self.path)
+
+    def get(self, name, default=None):
+        return self.prices.get(name.lower(), default)
+
+    def __getitem__(self, name):
+        return self.prices[name.lower()]
+
+    def __contains__(self, name):
+        return name.lower() in self.prices
+
+    def __len__(self):
+        return len(self.prices)
+
+    def items(self):
+        return self.prices.items()
+
+    def compile(self, class_names):
+        return CompiledPrices(class_names, self.prices, self.version)
+
+    def reload(self):
+        # Load everything first; the live prices only change if the whole file was valid
+        if self.path is None:
+            return False
+        with self.lock:
+            try:
+                prices = self.normalize(self.read())
+            except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+                print(f"Error reloading price catalog {self.path}: {e}")
+                return False
+            self.prices = prices
+            self.version += 1
+        print(f"Reloaded price catalog {self.path} ({len(prices)} items)")
+        return True
+
+    def maybe_reload(self):
+        # Cheap enough to call on every batch
+        if self.path is None:
+            return False
+        now = time.monotonic()
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        return mtime != self.mtime and self.reload()
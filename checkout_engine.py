@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import cv2
+import numpy as np
+from runtimes import load_model
+from roi import merge_baskets
+from catalog import PriceCatalog, ZERO
+from overlay import LABELS
+
+# Default prices for the object classes the cashier knows about
+DEFAULT_PRICES = {
+    "apple": 1,
+    "banana": 2,
+    "orange": 3,
+    "bottle": 4,
+    "mouse": 5,
+    "carrot": 6,
+    "chair": 20
+}
+
+
+class CheckoutEngine:
+    # UI-free detection and pricing: frames in, baskets out
+    def __init__(self, model_path='yolov8n.pt', prices=None, conf_threshold=0.5, batch_size=8,
+                 runtime='torch', precision='fp32', rois=None, cache=None):
+        # runtime/precision pick PyTorch, ONNX Runtime or OpenVINO (see runtimes.py)
+        self.model = load_model(model_path, runtime, precision)
+        self.rois = list(rois or [])  # TrayROIs; when set, only the trays are sent to the model
+        # prices can be a dict, a CSV/JSON/SQLite catalog file or a PriceCatalog (see catalog.py)
+        self.catalog = prices if isinstance(prices, PriceCatalog) else \
+            PriceCatalog(DEFAULT_PRICES if prices is None else prices)
+        self.conf_threshold = conf_threshold
+        self.batch_size = batch_size
+        self.cache = cache  # Optional DetectionCache; near-identical frames reuse their basket
+        self.results = []  # (basket, latency) pairs waiting for poll()
+        self.refresh_prices()
+
+    def refresh_prices(self):
+        # Precompute class id -> name/price lookups so results can be priced without string lookups
+        names = self.model.names
+        self.class_names = [names.get(cls, str(cls)) for cls in range(max(names) + 1)]
+        self.price_table = self.catalog.compile(self.class_names)
+
+    def current_prices(self):
+        # Pick up catalog edits between batches; a batch is always priced with one version
+        self.catalog.maybe_reload()
+        if self.price_table.version != self.catalog.version:
+            self.price_table = self.catalog.compile(self.class_names)
+        return self.price_table
+
+    def load_frame(self, frame):
+        # Accept either a BGR NumPy array or a path to an image file
+        if isinstance(frame, (str, os.PathLike)):
+            image = cv2.imread(os.fspath(frame))
+            if image is None:
+                raise ValueError(f"Could not read image: {frame}")
+            return image
+        return frame
+
+    def run_model(self, items):
+        # items are (image, roi) pairs; roi is None for whole frames
+        baskets = []
+        table = self.current_prices()
+
+        # Run the model on chunks of images instead of one call per image
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            results = self.model([image for image, _ in chunk], verbose=False)
+            baskets.extend(self.build_basket(result, roi, table) for result, (_, roi) in zip(results, chunk))
+        return baskets
+
+    def process_trays(self, frames):
+        # One basket per tray per frame; every tray of every frame goes through one batched pass
+        images = [self.load_frame(frame) for frame in frames]
+        baskets = self.run_model([(roi.crop(image), roi) for image in images for roi in self.rois])
+        count = len(self.rois)
+        return [baskets[i:i + count] for i in range(0, len(baskets), count)]
+
+    def process_batch(self, frames):
+        if self.cache is None:
+            return self.detect_batch(frames)
+
+        # Only frames that don't look like a recent one go to the model
+        images = [self.load_frame(frame) for frame in frames]
+        self.cache.check_version(self.current_prices().version)
+        keys = [self.cache.key(image, self.rois) for image in images]
+        baskets = [self.cache.get(key) for key in keys]
+        missing = [i for i, basket in enumerate(baskets) if basket is None]
+        if missing:
+            for i, basket in zip(missing, self.detect_batch([images[i] for i in missing])):
+                self.cache.put(keys[i], basket)
+                baskets[i] = basket
+        return baskets
+
+    def detect_batch(self, frames):
+        if self.rois:
+            # One basket per frame covering all of its trays
+            return [merge_baskets(trays) for trays in self.process_trays(frames)]
+        return self.run_model([(self.load_frame(frame), None) for frame in frames])
+
+    def process_frame(self, frame):
+        return self.process_batch([frame])[0]
+
+    def warmup(self, shape=(720, 960, 3)):
+        # Run one throwaway inference so the first real scan doesn't pay for lazy initialisation
+        self.model(np.zeros(shape, dtype=np.uint8), verbose=False)
+
+    def submit(self, frame):
+        # Same submit/poll interface as ProcessInferenceBackend; here the work happens right away
+        start = time.perf_counter()
+        basket = self.process_frame(frame)
+        self.results.append((basket, time.perf_counter() - start))
+        return True
+
+    def poll(self):
+        results, self.results = self.results, []
+        return results
+
+    def close(self):
+        pass
+
+    def build_basket(self, result, roi=None, table=None):
+        boxes = result.boxes
+        if table is None:
+            table = self.price_table
+
+        # Pull everything out of the result once as NumPy arrays
+        xyxy = boxes.xyxy.cpu().numpy()
+        conf = boxes.conf.cpu().numpy()
+        cls = boxes.cls.cpu().numpy().astype(np.int64)
+
+        # Boxes from a tray crop go back to full-frame coordinates
+        if roi is not None:
+            xyxy = roi.to_frame(xyxy)
+        xyxy = xyxy.astype(np.int64)
+
+        # Only keep results with high confidence
+        keep = conf > self.conf_threshold
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+        # Count priced items per class in one pass; totals stay exact Decimals
+        priced = table.priced[cls]
+        counts = np.bincount(cls[priced], minlength=len(table.class_names))
+
+        detected_objects = {}
+        for class_id in np.flatnonzero(counts):
+            count = int(counts[class_id])
+            detected_objects[table.class_names[class_id]] = {
+                'count': count,
+                'total': count * table.class_prices[class_id]
+            }
+
+        detections = [{
+            'box': tuple(box),
+            'conf': score,
+            'class_name': table.class_names[class_id],
+            'price': table.class_prices[class_id]
+        } for box, score, class_id in zip(xyxy.tolist(), conf.tolist(), cls.tolist())]
+
+        return {
+            'detections': detections,
+            'detected_objects': detected_objects,
+            'total_price': sum((item['total'] for item in detected_objects.values()), ZERO)
+        }
+
+
+def draw_detections(frame, detections):
+    # Draw boxes and price tags for a basket's detections onto a frame; the price tags are
+    # cached bitmaps, so each label is only rasterized the first time it shows up
+    for det in detections:
+        x1, y1, x2, y2 = det['box']
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+
+        if det['price'] is not None:
+            LABELS.draw(frame, f"{det['class_name']}: ${det['price']}", (x1, y1 - 10), (0, 255, 0))
+        else:
+            LABELS.draw(frame, f"{det['class_name']}: undefined", (x1, y1 - 10), (0, 0, 255))
+
+
+if __name__ == "__main__":
+    # Price a list of image files without opening any windows
+    engine = CheckoutEngine()
+    for path, basket in zip(sys.argv[1:], engine.process_batch(sys.argv[1:])):
+        print(json.dumps({'image': path, **basket}, default=str))
@@ -0,0 +1,288 @@
+import tkinter as tk
+from tkinter import ttk
+from assets import AssetCache, CHECKOUT_ASSETS, DARKEN
+from catalog import ZERO
+
+
+class CheckoutUI:
+    # One long-lived Tk event loop for the whole app. The camera loop runs as a repeating
+    # `after` callback, so live detection keeps going while the checkout window is open,
+    # and the checkout window is created once and then updated in place.
+    def __init__(self, prices, on_scan=None, on_retry=None, on_quit=None, on_checkout=None):
+        self.root = tk.Tk()
+        self.root.withdraw()  # Only used as the owner of the checkout windows
+        self.prices = prices
+        self.on_scan = on_scan
+        self.on_retry = on_retry
+        self.on_quit = on_quit
+        # Called with 'checkout', 'qr' or 'cash' and the basket being paid, for the transaction log
+        self.on_checkout = on_checkout
+
+        self.tk_window = None
+        self.item_list = None
+        self.total_price_label = None
+        self.rows = {}  # Item name -> values currently shown in the Treeview
+        self.total_price = ZERO
+        self.basket = ({}, ZERO)  # What the Treeview shows: (detected_objects, total_price)
+        self.paying = self.basket  # Basket on the checkout confirmation, fixed when Checkout is pressed
+
+        # Decode and pre-render every image variant once; the methods below just swap references
+        self.assets = AssetCache()
+        self.assets.preload()
+        self.qr_code_image = None
+        self.cash_image = None
+        self.buymeacoffee_image = None
+
+    def run(self, step, interval=1):
+        # Call step() over and over from the Tk event loop until stop()
+        def tick():
+            step()
+            if self.root is not None:
+                self.root.after(interval, tick)
+
+        self.root.after(interval, tick)
+        self.root.mainloop()
+
+    def stop(self):
+        if self.root is not None:
+            self.root.quit()
+            self.root.destroy()
+            self.root = None
+        self.tk_window = None
+
+    def is_open(self):
+        return self.tk_window is not None and self.tk_window.winfo_exists()
+
+    def display_price_window(self, detected_objects, total_price):
+        # Build the checkout window the first time, afterwards just push the new basket into it
+        if not self.is_open():
+            self.create_price_window()
+        else:
+            self.tk_window.deiconify()
+            self.tk_window.lift()
+        self.update_basket(detected_objects, total_price)
+
+    def close_price_window(self):
+        if self.is_open():
+            self.tk_window.destroy()
+        self.tk_window = None
+        self.rows = {}
+
+    def update_basket(self, detected_objects, total_price):
+        # Only touch Treeview rows whose values actually changed
+        if not self.is_open():
+            return
+
+        rows = {}
+        for item_name, data in detected_objects.items():
+            # Unit price of what was actually charged, so a catalog reload can't show a mismatch
+            price = data['total'] / data['count'] if data['count'] else self.prices.get(item_name.lower(), 0)
+            rows[item_name] = (item_name.capitalize(), f"{price:.2f}", data['count'], f"{data['total']:.2f}")
+
+        changed = rows != self.rows or total_price != self.total_price
+        for item_name in self.rows.keys() - rows.keys():
+            self.item_list.delete(item_name)
+        for item_name, values in rows.items():
+            if item_name not in self.rows:
+                self.item_list.insert("", "end", iid=item_name, values=values)
+            elif self.rows[item_name] != values:
+                self.item_list.item(item_name, values=values)
+        self.rows = rows
+
+        if total_price != self.total_price:
+            self.total_price_label.config(text=f"Total Price: ${total_price:.2f}")
+        self.total_price = total_price
+        if changed:
+            # The caller keeps updating its dicts in place, so keep a copy of what is on screen
+            self.basket = ({name: dict(data) for name, data in detected_objects.items()}, total_price)
+
+    def load_qr_code_image(self):
+        self.qr_code_image = self.assets.photo("qrcode.jpg", CHECKOUT_ASSETS["qrcode.jpg"])
+
+    def load_cash_image(self):
+        self.cash_image = self.assets.photo("cash.jpg", CHECKOUT_ASSETS["cash.jpg"])
+
+    def load_buymeacoffee_image(self):
+        self.buymeacoffee_image = self.assets.photo("buymeacoffee.jpg", CHECKOUT_ASSETS["buymeacoffee.jpg"])
+
+    def darken_qr_image(self):
+        self.qr_code_image = self.assets.photo("qrcode.jpg", CHECKOUT_ASSETS["qrcode.jpg"], DARKEN)
+        return self.qr_code_image
+
+    def restore_qr_image(self):
+        self.load_qr_code_image()
+        return self.qr_code_image
+
+    def darken_cash_image(self):
+        self.cash_image = self.assets.photo("cash.jpg", CHECKOUT_ASSETS["cash.jpg"], DARKEN)
+        return self.cash_image
+
+    def restore_cash_image(self):
+        self.load_cash_image()
+        return self.cash_image
+
+    def create_price_window(self):
+        self.tk_window = tk.Toplevel(self.root)
+        self.tk_window.title("Cashier Checkout")
+        self.tk_window.attributes("-fullscreen", True)
+        self.tk_window.configure(bg="#F8F9F0")  # Light gray background
+        self.tk_window.protocol("WM_DELETE_WINDOW", self.close_price_window)
+
+        title_label = tk.Label(self.tk_window, text="Cashier Checkout", font=("Helvetica", 40, "bold"), bg="#F8F9F0", fg="#333333")
+        title_label.pack(pady=20)
+
+        frame = tk.Frame(self.tk_window, bg="#FFFFFF", bd=2, relief="raised")
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        separator = ttk.Separator(self.tk_window, orient="horizontal")
+        separator.pack(fill="x", padx=20)
+
+        # Load the images
+        self.load_qr_code_image()
+        self.load_cash_image()
+
+        columns = ("Item", "Price", "Quantity", "Total")
+        self.item_list = ttk.Treeview(frame, columns=columns, show='headings', height=10)
+
+        self.item_list.heading("Item", text="Item")
+        self.item_list.heading("Price", text="Price ($)")
+        self.item_list.heading("Quantity", text="Quantity")
+        self.item_list.heading("Total", text="Total ($)")
+
+        self.item_list.column("Item", width=300, anchor="center")
+        self.item_list.column("Price", width=200, anchor="center")
+        self.item_list.column("Quantity", width=200, anchor="center")
+        self.item_list.column("Total", width=200, anchor="center")
+
+        style = ttk.Style()
+        style.configure("Treeview", font=("Helvetica", 18), rowheight=40)
+        style.configure("Treeview.Heading", font=("Helvetica", 24, "bold"))
+
+        self.item_list.pack(fill="both", expand=True)
+        self.rows = {}
+
+        self.total_price = ZERO
+        self.basket = ({}, ZERO)
+        self.total_price_label = tk.Label(frame, text=f"Total Price: ${self.total_price:.2f}", font=("Helvetica", 28, "bold"), bg="#FFFFFF", fg="#D9534F")
+        self.total_price_label.pack(pady=20)
+
+        button_frame = tk.Frame(self.tk_window, bg="#F8F9F0")
+        button_frame.pack(pady=20)
+
+        retry_button = ttk.Button(button_frame, text="Retry", command=self.retry_action, style="Accent.TButton")
+        retry_button.grid(row=0, column=0, padx=20, pady=10)
+
+        quit_button = ttk.Button(button_frame, text="Quit", command=self.close_price_window, style="Accent.TButton")
+        quit_button.grid(row=0, column=1, padx=20, pady=10)
+
+        checkout_button = ttk.Button(button_frame, text="Checkout", command=self.checkout_action, style="Accent.TButton")
+        checkout_button.grid(row=0, column=2, padx=20, pady=10)
+
+        style.configure("Accent.TButton", font=("Helvetica", 18, "bold"), padding=10)
+        style.map("Accent.TButton", foreground=[('active', '#FFFFFF')], background=[('active', '#D9534F')])
+
+        # The fullscreen window takes keyboard focus, so forward the camera shortcuts
+        if self.on_scan is not None:
+            self.tk_window.bind("<KeyPress-c>", lambda event: self.on_scan())
+        self.tk_window.bind("<KeyPress-e>", lambda event: self.retry_action())
+        if self.on_quit is not None:
+            self.tk_window.bind("<KeyPress-q>", lambda event: self.on_quit())
+
+    def retry_action(self):
+        if self.on_retry is not None:
+            self.on_retry()
+        else:
+            self.close_price_window()
+
+    def notify_checkout(self, event):
+        if self.on_checkout is not None:
+            self.on_checkout(event, *self.paying)
+
+    def checkout_action(self):
+        # The customer pays what the Treeview showed when they pressed Checkout
+        self.paying = self.basket
+        self.notify_checkout('checkout')
+        checkout_window = tk.Toplevel(self.tk_window)
+        checkout_window.title("Checkout Confirmation")
+        checkout_window.geometry("600x500")
+
+        price_label = tk.Label(checkout_window, text=f"Total Price: ${self.paying[1]:.2f}", font=("Helvetica", 30, "bold"), fg="#D9534F")
+        price_label.pack(pady=20)
+
+        paymentmethod_label = tk.Label(checkout_window, text=f'Select Payment Method', font=("Helvetica", 30, "bold"))
+        paymentmethod_label.pack(pady=5)
+
+        boxes_frame = tk.Frame(checkout_window)
+        boxes_frame.pack(pady=20)
+
+        qr_label = tk.Label(boxes_frame, text="QR Code", font=("Helvetica", 16, "bold"))
+        qr_label.grid(row=0, column=0, padx=10, pady=(0, 10), sticky="s")
+
+        cash_label = tk.Label(boxes_frame, text="Cashout", font=("Helvetica", 16, "bold"))
+        cash_label.grid(row=0, column=1, padx=10, pady=(0, 10), sticky="s")
+
+        def on_enter_qr(event):
+            qr_image_label.config(image=self.darken_qr_image())  # Change the image to a darker one
+
+        def on_leave_qr(event):
+            qr_image_label.config(image=self.restore_qr_image())  # Restore the original image
+
+        def on_enter_cash(event):
+            cash_image_label.config(image=self.darken_cash_image())  # Change the image to a darker one
+
+        def on_leave_cash(event):
+            cash_image_label.config(image=self.restore_cash_image())  # Restore the original image
+
+        qr_frame = tk.Frame(boxes_frame, width=250, height=200, bd=2, relief="raised", bg="#FFFFFF")
+        qr_frame.grid(row=1, column=0, padx=10)
+
+        cash_frame = tk.Frame(boxes_frame, width=250, height=200, bd=2, relief="raised", bg="#FFFFFF")
+        cash_frame.grid(row=1, column=1, padx=10)
+
+        if self.qr_code_image:
+            qr_image_label = tk.Label(qr_frame, image=self.qr_code_image, bg="#FFFFFF")
+            qr_image_label.pack(expand=True)
+            qr_image_label.bind("<Enter>", on_enter_qr)
+            qr_image_label.bind("<Leave>", on_leave_qr)
+            qr_image_label.bind("<Button-1>", self.qr_clicked)  # Add click event for the QR code
+
+        if self.cash_image:
+            cash_image_label = tk.Label(cash_frame, image=self.cash_image, bg="#FFFFFF")
+            cash_image_label.pack(expand=True)
+            cash_image_label.bind("<Enter>", on_enter_cash)
+            cash_image_label.bind("<Leave>", on_leave_cash)
+            cash_image_label.bind("<Button-1>", self.cash_clicked)  # Add click event for the Cash image
+
+    def qr_clicked(self, event):
+        self.notify_checkout('qr')
+
+        # Create a new window on click
+        new_window = tk.Toplevel(self.tk_window)
+        new_window.title("QrCode")
+        new_window.geometry("600x600")  # Increased window size
+
+        label = tk.Label(new_window, text="Scan the QRCode", font=("Helvetica", 24))
+        label.pack(pady=20)
+
+        # Load and display the Buy Me a Coffee image
+        self.load_buymeacoffee_image()  # Ensure the image is loaded
+        if self.buymeacoffee_image:
+            coffee_image_label = tk.Label(new_window, image=self.buymeacoffee_image)
+            coffee_image_label.pack(pady=10)
+
+        close_button = ttk.Button(new_window, text="Close", command=new_window.destroy)
+        close_button.pack(pady=20)
+
+    def cash_clicked(self, event):
+        self.notify_checkout('cash')
+
+        # Create a new window on click
+        new_window = tk.Toplevel(self.tk_window)
+        new_window.title("Cashout")
+        new_window.geometry("500x300")
+
+        label = tk.Label(new_window, text="Thank you for shopping with us", font=("Helvetica", 24))
+        label.pack(pady=50)
+
+        close_button = ttk.Button(new_window, text="Close", command=new_window.destroy)
+        close_button.pack(pady=20)
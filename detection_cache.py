@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def frame_hash(image, hash_size=16):
+    # Difference hash: grayscale, shrink to (hash_size + 1) x hash_size, one bit per horizontal
+    # neighbour pair (is the left pixel brighter?). Sensor noise and compression barely move it;
+    # an item being added, removed or moved flips a cluster of bits.
+    # Big frames get a cheap quarter-size bilinear shrink first, so the area resize that
+    # averages away the noise works on a sixteenth of the pixels
+    if image.shape[1] >= (hash_size + 1) * 16 and image.shape[0] >= hash_size * 16:
+        image = cv2.resize(image, (image.shape[1] // 4, image.shape[0] // 4), interpolation=cv2.INTER_LINEAR)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] < small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class DetectionCache:
+    # Small LRU of baskets keyed by perceptual hashes of the frame (or of each tray). A frame
+    # whose hashes are all within `threshold` bits of a cached entry reuses its detections and
+    # prices instead of running the model. Entries expire after `ttl` seconds so a slow change
+    # (a hand creeping in) is picked up, and everything is dropped when the catalog changes.
+    # With the default 16x16 hash one bit covers ~60x45 pixels of a 960x720 frame, so keep the
+    # threshold low (an item the size of an apple flips about 5 bits); stats() helps tune it.
+    def __init__(self, max_size=32, threshold=3, ttl=2.0, hash_size=16, clock=time.perf_counter):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.clock = clock  # What ttl is measured in (media time for offline runs)
+        self.hash_size = hash_size
+        self.entries = OrderedDict()  # key -> (basket, stored at)
+        self.version = None  # Catalog version the cached prices came from
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def key(self, image, rois=None):
+        # One hash for the whole frame, or one per tray (only the trays are priced)
+        if not rois:
+            return (frame_hash(image, self.hash_size),)
+        for roi in rois:
+            roi.match_frame(image)  # Trays past the frame edge are clipped, as for the model
+        return tuple(frame_hash(image[roi.y:roi.y + roi.h, roi.x:roi.x + roi.w], self.hash_size)
+                     for roi in rois)
+
+    def check_version(self, version):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, key):
+        now = self.clock()
+        best = None
+        best_distance = None
+        for cached_key, (basket, stored_at) in list(self.entries.items()):
+            if now - stored_at > self.ttl:
+                del self.entries[cached_key]
+                self.expired += 1
+                continue
+            if len(cached_key) != len(key):
+                continue
+            distances = [hamming(a, b) for a, b in zip(cached_key, key)]
+            if max(distances) > self.threshold:
+                continue
+            if best is None or sum(distances) < best_distance:
+                best, best_distance = cached_key, sum(distances)
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(best)
+        return self.entries[best][0]
+
+    def put(self, key, basket):
+        self.entries[key] = (basket, self.clock())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'size': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,86 @@
+import os
+import cv2
+import numpy as np
+
+# OpenCV's ResNet-10 SSD face model (deploy.prototxt + res10_300x300_ssd_iter_140000.caffemodel),
+# downloaded separately; see the OpenCV samples/dnn/face_detector folder
+DNN_PROTOTXT = 'deploy.prototxt'
+DNN_WEIGHTS = 'res10_300x300_ssd_iter_140000.caffemodel'
+
+
+class CascadeFaceDetector:
+    # Haar cascade run on a downscaled grayscale copy; boxes are scaled back to the frame.
+    # detectMultiScale builds its image pyramid from there, so the big, slow pyramid levels
+    # of the full-size frame are never computed. min_size is in full-frame pixels.
+    def __init__(self, downscale=0.5, scale_factor=1.1, min_neighbors=5, min_size=30, cascade=None):
+        if cascade is None:
+            cascade = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        self.cascade = cv2.CascadeClassifier(cascade)
+        if self.cascade.empty():
+            raise ValueError(f"Could not load cascade: {cascade}")
+        self.downscale = downscale
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = max(1, round(min_size * downscale))
+        self.gray = None
+        self.small = None
+
+    def detect(self, frame):
+        # Returns an (N, 4) int array of x, y, w, h boxes in frame coordinates
+        self.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        if self.downscale != 1.0:
+            size = (round(frame.shape[1] * self.downscale), round(frame.shape[0] * self.downscale))
+            self.small = cv2.resize(self.gray, size, dst=self.small, interpolation=cv2.INTER_AREA)
+        else:
+            self.small = self.gray
+        faces = self.cascade.detectMultiScale(self.small, scaleFactor=self.scale_factor,
+                                              minNeighbors=self.min_neighbors,
+                                              minSize=(self.min_size, self.min_size))
+        if len(faces) == 0:
+            return np.empty((0, 4), dtype=np.int64)
+        return np.round(np.asarray(faces, dtype=np.float64) / self.downscale).astype(np.int64)
+
+
+class DnnFaceDetector:
+    # OpenCV's DNN SSD face detector: one fixed 300x300 forward pass per frame, so its cost does
+    # not grow with frame size, and it finds turned and partly covered faces the cascade misses
+    def __init__(self, prototxt=DNN_PROTOTXT, weights=DNN_WEIGHTS, conf_threshold=0.6, size=(300, 300)):
+        for path in (prototxt, weights):
+            if not os.path.exists(path):
+                raise ValueError(f"DNN face model file not found: {path}")
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        self.conf_threshold = conf_threshold
+        self.size = size
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1.0, self.size, (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        out = self.net.forward()[0, 0]  # Rows of (_, _, confidence, x1, y1, x2, y2), coordinates 0..1
+
+        out = out[out[:, 2] > self.conf_threshold]
+        boxes = np.clip(out[:, 3:7], 0.0, 1.0) * (w, h, w, h)
+        boxes[:, 2:] -= boxes[:, :2]  # x1, y1, x2, y2 -> x, y, w, h
+        return np.round(boxes).astype(np.int64)
+
+
+DETECTORS = {
+    'cascade': CascadeFaceDetector,
+    'dnn': DnnFaceDetector
+}
+
+
+def make_detector(name='cascade', **kwargs):
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown face detector: {name}")
+    return DETECTORS[name](**kwargs)
+
+
+def face_detections(faces, price):
+    # Face boxes in the detection format IoUTracker works with
+    return [{
+        'box': (int(x), int(y), int(x + w), int(y + h)),
+        'conf': 1.0,
+        'class_name': 'face',
+        'price': price
+    } for x, y, w, h in faces]
@@ -0,0 +1,147 @@
+import time
+
+
+class FrameRingBuffer:
+    # Preallocated ring of frame slots shared by one capture thread (producer) and one loop (consumer).
+    # No locks: every handoff is a single attribute store, which the GIL makes atomic, and the
+    # producer never writes into the slot the consumer currently holds.
+    #
+    # mode='latest': the consumer always gets the newest frame; older unread frames are dropped.
+    # mode='every':  the producer waits for a free slot so the consumer sees every frame in order.
+    WRITING = -1
+
+    def __init__(self, slots=4, mode='latest'):
+        if mode not in ('latest', 'every'):
+            raise ValueError(f"Unknown ring buffer mode: {mode}")
+        if slots < 3:
+            raise ValueError("FrameRingBuffer needs at least 3 slots")
+
+        self.mode = mode
+        self.slots = [None] * slots  # Allocated on the first frame, then reused forever
+        self.seqs = [0] * slots  # Sequence number of the frame held by each slot
+        self.stamps = [0.0] * slots  # perf_counter() time each slot was filled
+        self.latest = -1  # Slot index of the newest published frame
+        self.write_seq = 0  # Sequence number of the newest published frame
+        self.read_seq = 0  # Sequence number of the last frame handed to the consumer
+        self.reading = -1  # Slot index the consumer currently owns
+        self.closed = False
+
+        # Frame accounting
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+
+        # Frame currently held by the consumer
+        self.seq = 0
+        self.timestamp = 0.0
+
+    # Producer side
+
+    def claim_write_slot(self):
+        seq = self.write_seq + 1
+        count = len(self.slots)
+
+        while not self.closed:
+            if self.mode == 'every':
+                # Frames go to fixed positions; wait until the old occupant has been read
+                idx = seq % count
+                if self.seqs[idx] > self.read_seq or idx == self.reading:
+                    time.sleep(0.001)
+                    continue
+            else:
+                # Any slot other than the newest frame and the one being read
+                idx = (self.latest + 1) % count
+                while idx == self.reading or idx == self.latest:
+                    idx = (idx + 1) % count
+
+            # Mark the slot as being written, then make sure the consumer did not grab it meanwhile
+            previous = self.seqs[idx]
+            self.seqs[idx] = self.WRITING
+            if idx != self.reading:
+                return idx
+            self.seqs[idx] = previous
+        return None
+
+    def publish(self, idx):
+        seq = self.write_seq + 1
+        self.stamps[idx] = time.perf_counter()
+        self.seqs[idx] = seq
+        self.latest = idx
+        self.write_seq = seq
+        self.captured += 1
+
+    def write_from(self, cap):
+        # Let cv2 decode straight into a preallocated slot (no extra copy)
+        idx = self.claim_write_slot()
+        if idx is None:
+            return False
+
+        ret, frame = cap.read(self.slots[idx])
+        if not ret:
+            self.seqs[idx] = 0
+            return False
+
+        # cv2 allocates a new array when the slot is missing or the wrong size; keep it as the slot
+        if frame is not self.slots[idx]:
+            self.slots[idx] = frame
+        self.publish(idx)
+        return True
+
+    def write(self, frame):
+        # Copy a frame that came from elsewhere into a slot
+        idx = self.claim_write_slot()
+        if idx is None:
+            return False
+
+        slot = self.slots[idx]
+        if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+            slot = self.slots[idx] = frame.copy()
+        else:
+            slot[...] = frame
+        self.publish(idx)
+        return True
+
+    def close(self):
+        self.closed = True
+
+    # Consumer side
+
+    def read(self, timeout=0.0):
+        # Return the next frame without copying it; the slot belongs to the caller until
+        # the next read() or release()
+        self.release()
+        deadline = time.perf_counter() + timeout
+
+        while True:
+            if self.mode == 'every':
+                seq = self.read_seq + 1
+                idx = seq % len(self.slots)
+            else:
+                seq, idx = self.write_seq, self.latest
+
+            if seq <= self.write_seq and idx >= 0 and seq > self.read_seq:
+                # Announce ownership first, then check the producer has not started overwriting it
+                self.reading = idx
+                if self.seqs[idx] == seq:
+                    self.dropped += seq - self.read_seq - 1
+                    self.processed += 1
+                    self.read_seq = self.seq = seq
+                    self.timestamp = self.stamps[idx]
+                    return self.slots[idx]
+                self.reading = -1
+                continue
+
+            if self.closed or time.perf_counter() >= deadline:
+                return None
+            time.sleep(0.001)
+
+    def release(self):
+        self.reading = -1
+
+    def stats(self):
+        return {
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'processed': self.processed,
+            'pending': self.write_seq - self.read_seq
+        }
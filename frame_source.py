@@ -0,0 +1,175 @@
+import os
+import time
+import threading
+import cv2
+from frame_buffer import FrameRingBuffer
+from shared_frames import SharedFramePool
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+STREAM_PREFIXES = ('rtsp://', 'rtsps://', 'rtmp://', 'http://', 'https://')
+
+
+def source_kind(source):
+    # 'camera' (device index), 'stream' (RTSP/HTTP), 'images' (folder or single image) or 'video'
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return 'camera'
+    source = os.fspath(source)
+    if source.lower().startswith(STREAM_PREFIXES):
+        return 'stream'
+    if os.path.isdir(source) or source.lower().endswith(IMAGE_EXTS):
+        return 'images'
+    return 'video'
+
+
+class FrameSource:
+    # Decodes frames on its own thread into a FrameRingBuffer, whatever they come from:
+    # a webcam, a video file, a folder of images or an RTSP/HTTP stream.
+    #
+    # pacing='realtime': recorded sources are played back at their frame rate (soak tests);
+    #                    frames the consumer can't keep up with are dropped like a live camera.
+    # pacing='fast':     recorded sources are decoded as fast as the consumer takes them and no
+    #                    frame is ever dropped (offline re-pricing). Frame N has seq N + 1, so
+    #                    runs are repeatable.
+    # Live sources (cameras, streams) always deliver the newest frame; streams reconnect on errors.
+    # shared=True decodes into a SharedFramePool so frames can go to other processes uncopied.
+    def __init__(self, source, pacing='realtime', fps=None, loop=False, width=None, height=None,
+                 slots=4, reconnect_delay=1.0, timer=None, shared=False):
+        if pacing not in ('realtime', 'fast'):
+            raise ValueError(f"Unknown pacing: {pacing}")
+
+        self.source = int(source) if isinstance(source, str) and source.isdigit() else source
+        self.kind = source_kind(source)
+        self.live = self.kind in ('camera', 'stream')
+        self.pacing = pacing
+        self.offline = pacing == 'fast' and not self.live  # Repeatable runs: see clock()
+        self.loop = loop
+        self.width = width
+        self.height = height
+        self.reconnect_delay = reconnect_delay
+        self.timer = timer  # Optional metrics Histogram for the time spent per decoded frame
+        self.running = True
+        self.finished = False
+        self.decoded = 0
+
+        mode = 'every' if pacing == 'fast' and not self.live else 'latest'
+        self.shared = shared
+        self.frames = SharedFramePool(slots=slots, mode=mode) if shared else FrameRingBuffer(slots=slots, mode=mode)
+
+        # Open up front so a wrong path or camera index fails here, not on the thread
+        if self.kind == 'images':
+            self.paths = self.list_images()
+            self.cap = None
+        else:
+            self.cap = self.open_capture()
+        self.fps = fps or (self.cap.get(cv2.CAP_PROP_FPS) if self.cap is not None else 0) or 30.0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def list_images(self):
+        if not os.path.isdir(self.source):
+            return [self.source]
+        paths = sorted(os.path.join(self.source, name) for name in os.listdir(self.source)
+                       if name.lower().endswith(IMAGE_EXTS))
+        if not paths:
+            raise ValueError(f"No images in {self.source}")
+        return paths
+
+    def open_capture(self):
+        cap = cv2.VideoCapture(self.source)
+        if self.width is not None:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height is not None:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if not cap.isOpened() and self.kind != 'stream':
+            raise ValueError(f"Could not open video source: {self.source}")
+        return cap
+
+    def media_time(self, seq):
+        # Position of frame `seq` in a recorded source, independent of how fast it was decoded
+        return (seq - 1) / self.fps
+
+    def clock(self):
+        # Media time of the frame the consumer holds; a drop-in for time.perf_counter in the
+        # scheduler, motion gate and detection cache so offline runs price the same frames
+        return self.media_time(self.frames.seq)
+
+    def pace(self, started, index):
+        # Real-time playback of recorded sources: frame N is due at started + N / fps
+        if self.pacing == 'realtime' and not self.live:
+            delay = started + index / self.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def run(self):
+        try:
+            if self.kind == 'images':
+                self.run_images()
+            else:
+                self.run_capture()
+        finally:
+            self.finished = True
+            self.frames.close()
+
+    def run_images(self):
+        started = time.perf_counter()
+        index = 0
+        while self.running:
+            for path in self.paths:
+                self.pace(started, index)
+                decode_start = time.perf_counter()
+                frame = cv2.imread(path)
+                if frame is None:
+                    print(f"Error: Could not read image {path}")
+                    continue
+                if not self.frames.write(frame):
+                    return
+                self.record(decode_start)
+                index += 1
+                if not self.running:
+                    return
+            if not self.loop:
+                return
+
+    def run_capture(self):
+        started = time.perf_counter()
+        index = 0
+        while self.running:
+            self.pace(started, index)
+            decode_start = time.perf_counter()
+            if self.frames.write_from(self.cap):
+                self.record(decode_start)
+                index += 1
+                continue
+            if self.frames.closed or not self.running:
+                break
+
+            if self.kind == 'video':
+                if not self.loop:
+                    break
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            elif self.kind == 'stream':
+                # Network hiccup: reopen the stream after a short pause
+                print(f"Stream {self.source} lost, reconnecting...")
+                self.cap.release()
+                time.sleep(self.reconnect_delay)
+                self.cap = self.open_capture()
+            else:
+                time.sleep(0.01)  # Webcam hiccup; try again
+        self.cap.release()
+
+    def record(self, decode_start):
+        self.decoded += 1
+        if self.timer is not None:
+            self.timer.observe(time.perf_counter() - decode_start)
+
+    def done(self):
+        # True once a recorded source has run out and every decoded frame has been read
+        return self.finished and self.frames.stats()['pending'] == 0
+
+    def stop(self):
+        self.running = False
+        self.frames.close()
+        self.thread.join()
+        if self.shared:
+            self.frames.unlink()
@@ -0,0 +1,283 @@
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+from catalog import PriceCatalog, to_money
+
+
+class MicroBatcher:
+    # Coalesces frames from concurrent requests into one process_batch call. The first frame
+    # waits at most max_wait for company; a full batch goes out right away.
+    def __init__(self, engine, max_batch=8, max_wait=0.01):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.frames = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, timeout=10.0):
+        # Called from the request threads; blocks until this frame's basket is ready
+        request = {'frame': frame, 'done': threading.Event(), 'basket': None, 'error': None}
+        self.requests.put(request)
+        if not request['done'].wait(timeout):
+            raise TimeoutError("Inference did not finish in time")
+        if request['error'] is not None:
+            raise request['error']
+        return request['basket']
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            try:
+                baskets = self.engine.process_batch([request['frame'] for request in batch])
+            except Exception as e:
+                baskets = [None] * len(batch)
+                for request in batch:
+                    request['error'] = e
+            for request, basket in zip(batch, baskets):
+                request['basket'] = basket
+                request['done'].set()
+            self.batches += 1
+            self.frames += len(batch)
+            if stop:
+                return
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'frames': self.frames,
+            'mean_batch': self.frames / self.batches if self.batches else 0.0,
+            'queued': self.requests.qsize()
+        }
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join(timeout=5)
+
+
+class InferenceServer:
+    # Detection and pricing for thin-client lanes over HTTP:
+    #   POST /detect   JPEG/PNG body -> basket JSON (same shape as CheckoutEngine.process_frame)
+    #   GET  /prices   the catalog as {name: price}
+    #   GET  /stats    micro-batching counters
+    def __init__(self, engine, host='127.0.0.1', port=8500, max_batch=None, max_wait=0.01):
+        self.engine = engine
+        self.batcher = MicroBatcher(engine, max_batch or getattr(engine, 'batch_size', 8), max_wait)
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def handle(self, method, path, body):
+        # Returns (status, JSON-able payload)
+        if method == 'POST' and path == '/detect':
+            frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                return 400, {'error': "Body is not a JPEG or PNG image"}
+            return 200, self.batcher.submit(frame)
+        if method == 'GET' and path == '/prices':
+            self.engine.catalog.maybe_reload()
+            return 200, dict(self.engine.catalog.items())
+        if method == 'GET' and path == '/stats':
+            return 200, self.batcher.stats()
+        return 404, {'error': f"No route for {method} {path}"}
+
+    def serve(self):
+        # Serves on daemon threads; returns the underlying ThreadingHTTPServer
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, so clients don't reconnect per frame
+
+            def respond(self, method):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                try:
+                    status, payload = server.handle(method, self.path.split('?')[0], body)
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                data = json.dumps(payload, default=str).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.respond('GET')
+
+            def do_POST(self):
+                self.respond('POST')
+
+            def log_message(self, format, *args):
+                pass  # One line per frame would flood the console
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Inference server at http://{self.host}:{self.server.server_port}")
+        return self.server
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.server.server_port}"
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.batcher.close()
+
+
+class RemoteEngine:
+    # Client side: the CheckoutEngine interface (submit/poll, process_frame/process_batch, catalog)
+    # backed by an InferenceServer. Frames go out as JPEGs on up to `in_flight` connections, so
+    # the camera loop never waits on the network; submit() drops the frame when all are busy.
+    def __init__(self, url='http://127.0.0.1:8500', in_flight=2, quality=85, timeout=5.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.quality = quality
+        self.timeout = timeout
+        self.in_flight = in_flight
+        self.connections = threading.local()  # One keep-alive connection per sender thread
+        self.pool = ThreadPoolExecutor(max_workers=in_flight)
+        self.pending = []
+        self.catalog = PriceCatalog(self.request('GET', '/prices'))
+
+    def request(self, method, path, body=None, headers=None):
+        conn = getattr(self.connections, 'conn', None)
+        for attempt in (1, 2):
+            if conn is None:
+                conn = self.connections.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                conn = self.connections.conn = None
+                if attempt == 2:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Inference server error {response.status}: {payload.get('error')}")
+        return payload
+
+    def detect(self, frame):
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Could not encode frame")
+        basket = self.request('POST', '/detect', jpeg.tobytes(), {'Content-Type': 'image/jpeg'})
+        return parse_basket(basket)
+
+    def submit(self, frame):
+        if len(self.pending) >= self.in_flight:
+            return False
+        # The frame slot is recycled once the camera loop moves on, so the sender gets a copy
+        started = time.perf_counter()
+        self.pending.append((self.pool.submit(self.detect, frame.copy()), started))
+        return True
+
+    def poll(self):
+        finished = []
+        still_pending = []
+        for future, started in self.pending:
+            if not future.done():
+                still_pending.append((future, started))
+                continue
+            try:
+                basket = future.result()
+            except Exception as e:
+                print(f"Error: Remote inference failed: {e}")
+                basket = None  # Still reported, so a caller waiting on this frame moves on
+            finished.append((basket, time.perf_counter() - started))
+        self.pending = still_pending
+        return finished
+
+    def process_batch(self, frames):
+        # Concurrent requests, so the server can batch them together
+        return list(self.pool.map(self.detect, frames))
+
+    def process_frame(self, frame):
+        return self.detect(frame)
+
+    def warmup(self, shape=(720, 960, 3)):
+        self.detect(np.zeros(shape, dtype=np.uint8))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def parse_basket(basket):
+    # JSON carries prices as strings and boxes as lists; restore what the tracker expects
+    for det in basket['detections']:
+        det['box'] = tuple(det['box'])
+        if det['price'] is not None:
+            det['price'] = to_money(det['price'])
+    for data in basket['detected_objects'].values():
+        data['total'] = to_money(data['total'])
+    basket['total_price'] = to_money(basket['total_price'])
+    return basket
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve checkout detection and pricing over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8500)
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--runtime', default='torch', choices=['torch', 'onnx', 'openvino'])
+    parser.add_argument('--precision', default='fp32', choices=['fp32', 'fp16', 'int8'])
+    parser.add_argument('--prices', help="CSV/JSON/SQLite price catalog")
+    parser.add_argument('--max-batch', type=int, default=8, help="Most frames per model call")
+    parser.add_argument('--max-wait-ms', type=float, default=10.0,
+                        help="How long the first frame of a batch waits for others")
+    args = parser.parse_args(argv)
+
+    from checkout_engine import CheckoutEngine
+
+    engine = CheckoutEngine(args.model, prices=args.prices, batch_size=args.max_batch,
+                            runtime=args.runtime, precision=args.precision)
+    engine.warmup()
+    server = InferenceServer(engine, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+    server.serve()
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Batching: {server.batcher.stats()}")
+    except KeyboardInterrupt:
+        pass
+    server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+
+# Bucket upper bounds in seconds, 0.5 ms to 5 s; enough resolution for frame and model timings
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.075, 0.1, 0.15,
+                   0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    # Fixed buckets, so observe() is a bisect and two increments with no allocation. Each
+    # histogram is meant to be fed from one thread; readers only ever see slightly stale counts.
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.last = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.last = seconds
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile; good enough for dashboards
+        if not self.count:
+            return 0.0
+        rank = self.count * q / 100
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {seen}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.sum / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000
+        }
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    # Either set() directly or read from `source` whenever the metrics are rendered, so values
+    # that already exist elsewhere (queue depths, drop counts) cost nothing on the hot path
+    def __init__(self, name, help_text, source=None):
+        self.name = name
+        self.help_text = help_text
+        self.source = source
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        if self.source is None:
+            return self.value
+        try:
+            return self.source()
+        except Exception:
+            return float('nan')
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.get()}"]
+
+    def snapshot(self):
+        return self.get()
+
+
+class MetricsRegistry:
+    def __init__(self, prefix='checkout'):
+        self.prefix = prefix
+        self.metrics = {}
+        self.server = None
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.metrics[name] = Histogram(f"{self.prefix}_{name}", help_text, buckets)
+        return self.metrics[name]
+
+    def counter(self, name, help_text):
+        self.metrics[name] = Counter(f"{self.prefix}_{name}", help_text)
+        return self.metrics[name]
+
+    def gauge(self, name, help_text, source=None):
+        self.metrics[name] = Gauge(f"{self.prefix}_{name}", help_text, source)
+        return self.metrics[name]
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        # GET /metrics on a daemon thread; local only by default
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the console
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Metrics at http://{host}:{self.server.server_port}/metrics")
+        return self.server
+
+    def dump_every(self, seconds, output=print):
+        # Periodic stats dump for setups without a scraper
+        def dump():
+            while True:
+                time.sleep(seconds)
+                output(f"Metrics: {self.snapshot()}")
+
+        threading.Thread(target=dump, daemon=True).start()
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def draw_metrics(frame, lines, origin=(480, 30)):
+    # Small text block to the right of the Scan/Retry/Quit buttons
+    x, y = origin
+    cv2.rectangle(frame, (x - 5, y - 5), (x + 260, y + 18 * len(lines)), (0, 0, 0), -1)
+    for i, line in enumerate(lines):
+        cv2.putText(frame, line, (x, y + 12 + 18 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+
+
+def camera_metrics(camera):
+    # Standard set of metrics for a MobileCamera: stage timers on the hot path, everything
+    # else read from the components that already count it
+    registry = MetricsRegistry()
+    registry.histogram('frame_wait_seconds', "Time the camera loop waited for a new frame")
+    registry.histogram('capture_seconds', "Time the capture thread spent grabbing and decoding a frame")
+    registry.histogram('inference_seconds', "Submit-to-basket latency of a model call")
+    registry.histogram('draw_seconds', "Time spent updating the basket and drawing the overlay")
+    registry.histogram('display_seconds', "Time spent in imshow and waitKey")
+    registry.histogram('loop_seconds', "Total time of one camera loop iteration with a frame")
+    registry.histogram('capture_photo_seconds', "Time taken by a scan on the UI thread")
+    registry.counter('scans_total', "Scans started")
+
+    registry.gauge('frames_captured_total', "Frames written by the capture thread",
+                   lambda: camera.frames.stats()['captured'])
+    registry.gauge('frames_dropped_total', "Frames overwritten before the camera loop read them",
+                   lambda: camera.frames.stats()['dropped'])
+    registry.gauge('frame_queue_depth', "Captured frames waiting for the camera loop",
+                   lambda: camera.frames.stats()['pending'])
+    registry.gauge('fps', "Frames shown per second", lambda: camera.scheduler.stats()['fps'])
+    registry.gauge('inference_interval', "Frames per model call chosen by the scheduler",
+                   lambda: camera.scheduler.interval)
+    registry.gauge('motion_gate_hits_total', "Frames that skipped the model because nothing moved",
+                   lambda: camera.gate.hits)
+    registry.gauge('motion_gate_misses_total', "Frames the motion gate sent to the model",
+                   lambda: camera.gate.misses)
+    registry.gauge('snapshot_backlog', "Snapshots waiting to be written", lambda: camera.snapshots.backlog.qsize())
+    registry.gauge('transaction_backlog', "Transactions waiting to be committed",
+                   lambda: camera.transactions.backlog.qsize())
+    # Added up over the worker processes with backend='process'; NaN without a cache
+    registry.gauge('detection_cache_hit_rate', "Share of model calls answered by the detection cache",
+                   lambda: camera.detector.cache_stats()['hit_rate'])
+    return registry
+
+
+def overlay_lines(registry):
+    # Text for draw_metrics(); cheap enough to rebuild a couple of times per second
+    snapshot = registry.snapshot()
+    inference = snapshot['inference_seconds']
+    checked = snapshot['motion_gate_hits_total'] + snapshot['motion_gate_misses_total']
+    return [
+        f"{snapshot['fps']:.1f} fps, model every {snapshot['inference_interval']} frames",
+        f"model p50 {inference['p50_ms']:.0f} ms, p95 {inference['p95_ms']:.0f} ms",
+        f"dropped {snapshot['frames_dropped_total']}, queued {snapshot['frame_queue_depth']}",
+        f"gate skipped {snapshot['motion_gate_hits_total']} of {checked}"
+    ]
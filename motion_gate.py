@@ -0,0 +1,86 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    # Cheap pre-stage in front of the model: compares a small blurred grayscale copy of each
+    # frame with the one last sent to the model and only lets the frame through when enough
+    # of it changed. A static counter keeps its previous basket without any model calls.
+    # After motion stops, `settle_frames` more frames go through so the tracker can confirm
+    # where things came to rest, and `max_idle` forces a refresh now and then in case a small
+    # change slipped under the threshold. While the tracker is not settled (items still being
+    # confirmed, or a removed item not yet dropped) every frame goes through, otherwise a removal
+    # would stay in the basket until the next max_idle refresh.
+    def __init__(self, width=160, pixel_threshold=25, min_changed=0.005, settle_frames=3, max_idle=5.0,
+                 clock=time.perf_counter):
+        self.width = width
+        self.clock = clock  # What max_idle is measured in (media time for offline runs)
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.settle_frames = settle_frames
+        self.max_idle = max_idle
+        self.reference = None  # Small frame last sent to the model
+        self.small = None
+        self.diff = None
+        self.settle = 0
+        self.changed = False  # Whether the last checked frame differed from the reference
+        self.last_passed = 0.0
+        self.changed_fraction = 0.0
+        self.idle = False  # True while frames are being skipped
+        self.hits = 0  # Frames skipped because nothing changed
+        self.misses = 0  # Frames that had to go to the model
+
+    def shrink(self, frame):
+        height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def check(self, frame, settled=True):
+        # Returns True when the frame needs new detections; `settled` is tracker.settled().
+        # Nothing is committed until accept(), so a frame the detector turned down (busy
+        # backend) is compared again next time instead of counting as seen.
+        self.small = self.shrink(frame)
+        now = self.clock()
+
+        if self.reference is None or self.reference.shape != self.small.shape:
+            self.changed = True
+            self.changed_fraction = 1.0
+        else:
+            self.diff = cv2.absdiff(self.small, self.reference, dst=self.diff)
+            self.changed_fraction = float(np.count_nonzero(self.diff > self.pixel_threshold)) / self.diff.size
+            self.changed = self.changed_fraction >= self.min_changed
+
+        if not self.changed and self.settle <= 0 and settled and now - self.last_passed < self.max_idle:
+            self.hits += 1
+            self.idle = True
+            return False
+        self.idle = False
+        return True
+
+    def accept(self):
+        # The frame from the last check() went to the model; later frames are compared with it
+        if self.changed:
+            self.settle = self.settle_frames
+        elif self.settle > 0:
+            self.settle -= 1
+        self.reference = self.small
+        self.last_passed = self.clock()
+        self.misses += 1
+
+    def reset(self):
+        # Forget the reference so the next frame always goes to the model (e.g. after a retry)
+        self.reference = None
+        self.settle = 0
+        self.idle = False
+
+    def stats(self):
+        checked = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / checked if checked else 0.0,
+            'changed_fraction': self.changed_fraction
+        }
@@ -0,0 +1,125 @@
+import sys
+import time
+from collections import defaultdict
+from checkout_engine import CheckoutEngine
+from frame_source import FrameSource
+from catalog import ZERO
+from tracker import IoUTracker
+from motion_gate import MotionGate
+
+
+class LaneCamera:
+    # One checkout lane: its own frame source and basket, but no model of its own
+    def __init__(self, lane_id, camera, pacing='realtime'):
+        self.lane_id = lane_id
+        self.camera = camera
+        self.pacing = pacing
+        self.source = None
+        self.frames = None
+        self.detected_objects = defaultdict(lambda: {'count': 0, 'total': ZERO})
+        self.total_price = ZERO
+        self.tracker = IoUTracker(min_hits=3)
+        self.gate = MotionGate()  # An idle lane costs a tiny frame difference, not a model call
+        self.detections = []
+        self.latency = 0.0  # Seconds from capture to priced basket for the last result
+
+    def start(self):
+        self.source = FrameSource(self.camera, pacing=self.pacing, width=960, height=720)
+        self.frames = self.source.frames
+
+    def take_frame(self):
+        # Hand out the latest frame only if it has not been sent to the model yet and the scene
+        # changed since the last one that was; the lane keeps ownership of the slot until its
+        # basket has been updated
+        frame = self.frames.read()
+        if frame is None:
+            return None
+        if not self.gate.check(frame, self.tracker.settled()):
+            self.frames.release()
+            return None
+        self.gate.accept()  # process_batch() always takes every frame
+        return frame, self.frames.timestamp
+
+    def update_basket(self, basket, captured_at):
+        self.tracker.update(basket['detections'])
+        basket = self.tracker.basket()
+
+        self.detected_objects.clear()
+        self.detected_objects.update(basket['detected_objects'])
+        self.total_price = basket['total_price']
+        self.detections = basket['detections']
+        self.latency = time.perf_counter() - captured_at
+        self.frames.release()
+        return basket
+
+    def done(self):
+        return self.source is not None and self.source.done()
+
+    def stop(self):
+        if self.source is not None:
+            self.source.stop()
+
+
+class MultiLaneCheckout:
+    # Serve many lanes from one shared model with one batched inference per round
+    def __init__(self, cameras, engine=None, on_basket=None, idle_sleep=0.005, pacing='realtime'):
+        # cameras can mix webcams, streams and recordings; pacing='fast' re-prices recordings
+        # without dropping frames
+        self.engine = engine if engine is not None else CheckoutEngine()
+        self.lanes = [LaneCamera(lane_id, camera, pacing) for lane_id, camera in enumerate(cameras)]
+        self.on_basket = on_basket
+        self.idle_sleep = idle_sleep
+        self.running = True
+
+        # Make sure every lane fits into a single model call
+        self.engine.batch_size = max(self.engine.batch_size, len(self.lanes))
+
+    def step(self):
+        # Collect at most one (the latest) frame per lane so no lane can starve the others
+        pending = []
+        for lane in self.lanes:
+            taken = lane.take_frame()
+            if taken is not None:
+                pending.append((lane, taken[0], taken[1]))
+
+        if not pending:
+            return 0
+
+        baskets = self.engine.process_batch([frame for _, frame, _ in pending])
+        for (lane, _, captured_at), basket in zip(pending, baskets):
+            basket = lane.update_basket(basket, captured_at)
+            if self.on_basket is not None:
+                self.on_basket(lane, basket)
+        return len(pending)
+
+    def run(self):
+        for lane in self.lanes:
+            lane.start()
+
+        try:
+            while self.running:
+                if self.step() == 0:
+                    # Stop once every recorded source has been played through
+                    if all(lane.done() for lane in self.lanes):
+                        break
+                    time.sleep(self.idle_sleep)
+        finally:
+            for lane in self.lanes:
+                lane.stop()
+
+    def stop(self):
+        self.running = False
+
+
+if __name__ == "__main__":
+    # Example: python multilane.py 0 1 2 3
+    cameras = [int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]] or [0]
+
+    def print_basket(lane, basket):
+        print(f"Lane {lane.lane_id}: ${lane.total_price} ({lane.latency * 1000:.0f} ms)")
+
+    checkout = MultiLaneCheckout(cameras, on_basket=print_basket)
+    try:
+        checkout.run()
+    except KeyboardInterrupt:
+        checkout.stop()
@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+
+
+class Sprite:
+    # A pre-rendered patch plus the mask of the pixels it covers. blit() puts it on a frame
+    # with one masked copy (cv2.copyTo) instead of re-running the cv2 drawing calls.
+    def __init__(self, patch, mask, x=0, y=0):
+        self.patch = patch
+        self.mask = mask
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def render(cls, draw, width, height):
+        # Run `draw(canvas)` on a black and on a white canvas. Where both agree the pixel was
+        # painted over; where they differ, the difference says how much background shows
+        # through. Soft stroke edges are snapped to on/off (at 50%) so a blit stays one copy.
+        # The sprite is cropped to the painted area and remembers where that area sits.
+        black = np.zeros((height, width, 3), dtype=np.uint8)
+        white = np.full((height, width, 3), 255, dtype=np.uint8)
+        draw(black)
+        draw(white)
+        see_through = (white.astype(np.int16) - black).mean(axis=2)
+        mask = (see_through < 128).astype(np.uint8)
+        if not mask.any():
+            return cls(black[:0, :0], mask[:0, :0])
+
+        # The color under a soft edge is premultiplied on the black canvas; undo that
+        opacity = np.maximum(1.0 - see_through / 255, 1e-6)[..., None]
+        patch = np.clip(black / opacity + 0.5, 0, 255).astype(np.uint8)
+        x, y, w, h = cv2.boundingRect(mask)
+        return cls(patch[y:y + h, x:x + w].copy(), mask[y:y + h, x:x + w].copy(), x, y)
+
+    def blit(self, frame, x=None, y=None):
+        # Clipped to the frame, so labels near the edges still work
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        h, w = self.patch.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        cv2.copyTo(self.patch[y0 - y:y1 - y, x0 - x:x1 - x], self.mask[y0 - y:y1 - y, x0 - x:x1 - x],
+                   frame[y0:y1, x0:x1])
+
+
+class LabelCache:
+    # Text bitmaps rendered once per (text, color) and reused for every frame after that.
+    # Prices only change when the catalog does, so the cache stays small.
+    def __init__(self, font=cv2.FONT_HERSHEY_SIMPLEX, scale=1, thickness=2, max_size=512):
+        self.font = font
+        self.scale = scale
+        self.thickness = thickness
+        self.max_size = max_size
+        self.sprites = {}
+
+    def get(self, text, color):
+        key = (text, color)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= self.max_size:
+                self.sprites.clear()
+            (w, h), baseline = cv2.getTextSize(text, self.font, self.scale, self.thickness)
+            pad = 2 * self.thickness + 2  # Strokes reach a little past getTextSize's box
+
+            def draw(canvas):
+                cv2.putText(canvas, text, (pad, pad + h), self.font, self.scale, color, self.thickness)
+
+            sprite = Sprite.render(draw, w + 2 * pad, h + baseline + 2 * pad)
+            # Remember where the text baseline sits relative to the cropped patch
+            sprite.baseline = pad + h - sprite.y
+            sprite.left = pad - sprite.x
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, frame, text, origin, color):
+        # Same placement as cv2.putText(frame, text, origin, ...)
+        sprite = self.get(text, color)
+        sprite.blit(frame, origin[0] - sprite.left, origin[1] - sprite.baseline)
+
+
+def render_buttons(buttons, width=960, height=720):
+    # `buttons` are (text, top-left, bottom-right, text origin); rendered as a single sprite
+    def draw(canvas):
+        for text, top_left, bottom_right, text_origin in buttons:
+            cv2.rectangle(canvas, top_left, bottom_right, (200, 200, 200), -1)
+            cv2.putText(canvas, text, text_origin, cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+
+    return Sprite.render(draw, width, height)
+
+
+# The Scan/Retry/Quit bar shared by the cameras (same layout as the mouse hit areas)
+BUTTONS = [
+    ("Scan", (30, 30), (150, 80), (50, 65)),
+    ("Retry", (180, 30), (300, 80), (200, 65)),
+    ("Quit", (330, 30), (450, 80), (350, 65))
+]
+
+BUTTON_BAR = None
+LABELS = LabelCache()
+
+
+def draw_buttons(frame):
+    # Rendered on first use, then every frame is a single masked copy
+    global BUTTON_BAR
+    if BUTTON_BAR is None:
+        BUTTON_BAR = render_buttons(BUTTONS)
+    BUTTON_BAR.blit(frame)
@@ -0,0 +1,497 @@
+import time
+from collections import defaultdict
+import cv2
+from checkout_engine import CheckoutEngine, draw_detections
+from catalog import PriceCatalog, ZERO
+from face_detection import make_detector, face_detections
+from frame_source import FrameSource
+from scheduler import AdaptiveScheduler
+from tracker import IoUTracker
+from motion_gate import MotionGate
+from snapshot_writer import SnapshotWriter
+from transaction_log import TransactionLog
+from startup import StartupTimer, BackgroundLoader
+from metrics import camera_metrics, overlay_lines, draw_metrics
+from overlay import draw_buttons
+
+
+class YoloDetector:
+    # Detector plugin around the checkout engine (in-process, worker processes or an inference
+    # server at `server`). load() does the slow part (import, model load, warm-up) so it can run
+    # in the background.
+    def __init__(self, backend='local', workers=1, model_path='yolov8n.pt', runtime='torch', precision='fp32',
+                 rois=None, prices=None, server='http://127.0.0.1:8500', cache=None):
+        if backend == 'remote':
+            # The server prices whole frames from its own catalog; it can't honour these
+            ignored = [name for name, value in (('rois', rois), ('prices', prices), ('cache', cache)) if value]
+            if ignored:
+                raise ValueError(f"backend='remote' does not support {', '.join(ignored)} "
+                                 f"(the server prices whole frames; give it its catalog with --prices)")
+        self.backend = backend
+        self.cache = cache  # DetectionCache for the engine (each worker process gets its own copy)
+        self.server = server
+        self.workers = workers
+        self.model_path = model_path
+        self.runtime = runtime
+        self.precision = precision
+        self.rois = list(rois or [])
+        self.prices = prices
+        self.engine = None
+
+    def load(self, startup=None):
+        with phase(startup, "model load"):
+            if self.backend == 'remote':
+                # Thin client: the model (and the catalog) live on the inference server
+                from inference_server import RemoteEngine
+                self.engine = RemoteEngine(self.server)
+            elif self.backend == 'process':
+                # Run the model in worker processes so inference never stalls capture or the UI
+                from process_backend import ProcessInferenceBackend
+                self.engine = ProcessInferenceBackend(workers=self.workers, model_path=self.model_path,
+                                                      runtime=self.runtime, precision=self.precision,
+                                                      rois=self.rois, prices=self.prices, cache=self.cache)
+            else:
+                self.engine = CheckoutEngine(self.model_path, prices=self.prices, runtime=self.runtime,
+                                             precision=self.precision, rois=self.rois, cache=self.cache)
+        with phase(startup, "model warm-up"):
+            self.engine.warmup()
+        return self
+
+    @property
+    def catalog(self):
+        return self.engine.catalog
+
+    @property
+    def model(self):
+        return getattr(self.engine, 'model', None)
+
+    def detect(self, frame):
+        return self.engine.process_frame(frame)['detections']
+
+    def cache_stats(self):
+        # The detection cache's counters; with worker processes, theirs rather than the unused local copy
+        if self.cache is None:
+            return None
+        if hasattr(self.engine, 'cache_stats'):
+            return self.engine.cache_stats()
+        return self.cache.stats()
+
+    def use_frames(self, pool):
+        # Worker processes read SharedFramePool frames in place
+        if hasattr(self.engine, 'use_frames'):
+            self.engine.use_frames(pool)
+
+    def submit(self, frame):
+        return self.engine.submit(frame)
+
+    def poll(self):
+        # (detections, latency) for every finished frame; detections is None for a failed one
+        return [(None if basket is None else basket['detections'], latency)
+                for basket, latency in self.engine.poll()]
+
+    def close(self):
+        self.engine.close()
+
+
+class FaceDetector:
+    # Detector plugin around face_detection.py; every face is one item priced from the catalog
+    def __init__(self, detector='cascade', name='Human', price=10, **detector_kwargs):
+        self.detector_name = detector
+        self.detector_kwargs = detector_kwargs
+        self.name = name
+        self.catalog = PriceCatalog({name: price})
+        self.detector = None
+        self.model = None
+        self.results = []
+
+    def load(self, startup=None):
+        with phase(startup, "model load"):
+            self.detector = make_detector(self.detector_name, **self.detector_kwargs)
+        return self
+
+    def detect(self, frame):
+        detections = face_detections(self.detector.detect(frame), self.catalog.get(self.name))
+        for det in detections:
+            det['class_name'] = self.name
+        return detections
+
+    def submit(self, frame):
+        # Runs right away, like the in-process checkout engine
+        start = time.perf_counter()
+        detections = self.detect(frame)
+        self.results.append((detections, time.perf_counter() - start))
+        return True
+
+    def use_frames(self, pool):
+        pass  # Detects in-process, nothing to share
+
+    def poll(self):
+        results, self.results = self.results, []
+        return results
+
+    def close(self):
+        pass
+
+
+class Pipeline:
+    # The shared per-frame core: detector -> tracker (pricing) -> renderer. Frames come from a
+    # FrameSource and baskets go to whatever sink the camera has (window, checkout UI, journal).
+    # The scheduler decides which frames run the detector, the motion gate skips it while the
+    # scene is static, and the tracker carries items across the frames in between.
+    def __init__(self, detector, tracker, scheduler=None, gate=None, rois=None, timers=None):
+        self.detector = detector
+        self.lockstep = False  # Wait for each submitted frame's detections (see use_clock)
+        self.waiting = False
+        self.timeout = 30.0  # Longest lockstep wait for the detector before giving up
+        self.tracker = tracker
+        self.scheduler = scheduler
+        self.gate = gate
+        self.rois = list(rois or [])
+        self.timers = timers  # Optional metrics histograms (see metrics.camera_metrics)
+
+    def process(self, frame):
+        # Returns the tracked basket for this frame
+        if self.scheduler is None or self.scheduler.tick():
+            # The gate stays open until the tracker has confirmed or dropped every item
+            if self.gate is not None and not self.gate.check(frame, self.tracker.settled()):
+                self.skip()
+            elif self.submit(frame):
+                if self.gate is not None:
+                    self.gate.accept()
+            else:
+                self.skip()  # Backend busy; the gate still compares against what it last saw
+
+        # Results come back right away in-process, or whenever a worker finishes
+        results = self.detector.poll()
+        deadline = time.perf_counter() + self.timeout
+        while self.lockstep and self.waiting and not results:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"No detections after {self.timeout:.0f} s")
+            time.sleep(0.001)
+            results = self.detector.poll()
+        if results:
+            self.waiting = False
+        updated = False
+        for detections, latency in results:
+            if detections is None:
+                continue  # The detector reported this frame as failed; the tracker coasts
+            updated = True
+            self.tracker.update(detections)
+            if self.scheduler is not None:
+                self.scheduler.record_inference(latency)
+            if self.timers is not None:
+                self.timers['inference_seconds'].observe(latency)
+
+        # A static scene keeps the previous basket exactly as it is
+        if not updated and not (self.gate is not None and self.gate.idle):
+            self.tracker.predict()
+        return self.tracker.basket()
+
+    def submit(self, frame):
+        if not self.lockstep:
+            return self.detector.submit(frame)
+        # Offline: every chosen frame is detected, in order, however slow the backend is
+        deadline = time.perf_counter() + self.timeout
+        while not self.detector.submit(frame):
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Detector took no frame for {self.timeout:.0f} s")
+            time.sleep(0.001)
+        self.waiting = True
+        return True
+
+    def use_clock(self, clock):
+        # Offline runs (FrameSource.offline): time-based decisions follow the recording's media
+        # time, the scheduler stops adapting to measured latency and async backends run in
+        # lockstep, so re-pricing a recording gives the same baskets on any machine. Caches
+        # inside worker processes keep their own wall-clock TTL.
+        if self.scheduler is not None:
+            self.scheduler.clock = clock
+            self.scheduler.adaptive = False
+            self.scheduler.interval = 1
+        if self.gate is not None:
+            self.gate.clock = clock
+        cache = getattr(self.detector, 'cache', None)
+        if cache is not None:
+            cache.clock = clock
+        self.lockstep = True
+
+    def skip(self):
+        if self.scheduler is not None:
+            self.scheduler.skip()
+
+    def render(self, frame, basket):
+        for roi in self.rois:
+            roi.draw(frame)
+        draw_detections(frame, basket['detections'])
+
+
+class CheckoutCamera:
+    # The checkout app on top of the pipeline: frames from a FrameSource, baskets to the camera
+    # window, the Tk checkout screens, the snapshot writer and the transaction journal.
+    # com.py and detectcashier.py are configurations of this class.
+    #
+    # detector is a plugin with load/submit/poll/close (YoloDetector, FaceDetector); it loads in
+    # the background while the camera opens. show_scan also shows each scanned photo in its own
+    # window. shared_frames decodes into shared memory, which worker processes
+    # (backend='process') and the snapshot writer then read in place; the overlay is drawn on
+    # a copy only while one of them still holds the frame.
+    WINDOW = "Mobile Cam - Object Detection"
+
+    def __init__(self, detector, rois=None, min_hits=3, show_scan=False, shared_frames=False,
+                 metrics_port=None, show_metrics=False):
+        self.startup = StartupTimer()  # Timing breakdown of the startup phases
+        self.detector = detector
+        self.detector_loader = BackgroundLoader(lambda: detector.load(self.startup))
+        self.model = None  # Set once the background load finishes
+        self.rois = list(rois or [])
+        self.frame = None
+        self.source = None  # Decodes frames on its own thread (opened in getVideo)
+        self.frames = None  # The source's ring buffer of preallocated frame slots
+        self.running = True
+        self.scheduler = AdaptiveScheduler(target_fps=30)  # Decides which frames run the model
+        self.gate = MotionGate()  # Skips the model entirely while the counter is static
+        self.tracker = IoUTracker(min_hits=min_hits)  # Items join the basket after consistent detections
+        self.detections = []  # Tracked detections for the overlay
+        self.photo_count = 0
+        self.show_scan = show_scan
+        self.shared_frames = shared_frames
+        self.snapshots = SnapshotWriter(ext='.jpg', quality=90)  # Saves photos off the UI thread
+        self.transactions = TransactionLog('transactions.db')  # Crash-safe journal of scans and payments
+        self.transaction_id = None  # Transaction of the last scan
+        self.scanned_basket = ({}, ZERO)  # Basket as it was when it was scanned
+        self.scan_requested = False
+        self.total_price = ZERO
+        self.detected_objects = defaultdict(lambda: {'count': 0, 'total': ZERO})
+        self.show_price_window = False
+        self.prices = None  # The detector's price catalog, once loaded
+        self.ui = None  # Checkout screens share one Tk event loop with the camera loop
+
+        # Stage timers and counters; served at http://127.0.0.1:<metrics_port>/metrics when a port
+        # is given, and drawn next to the buttons when show_metrics is on ('m' toggles it)
+        self.metrics = camera_metrics(self)
+        if metrics_port is not None:
+            self.metrics.serve(metrics_port)
+        self.show_metrics = show_metrics
+        self.metrics_lines = []
+        self.metrics_refresh = 0.0
+
+        self.pipeline = Pipeline(detector, self.tracker, self.scheduler, self.gate, self.rois,
+                                 timers=self.metrics.metrics)
+
+    def getVideo(self, camera, pacing='realtime', loop=False):
+        # camera can be a webcam index, a video file, a folder of images or an RTSP/HTTP URL.
+        # Recorded sources play at their own frame rate, or as fast as possible with
+        # pacing='fast' (every frame is priced, e.g. to re-price a recorded session).
+        self.camera = camera
+        with self.startup.phase("camera open"):
+            self.source = FrameSource(camera, pacing=pacing, loop=loop, width=960, height=720,
+                                      slots=8 if self.shared_frames else 4,
+                                      timer=self.metrics.metrics['capture_seconds'], shared=self.shared_frames)
+            self.frames = self.source.frames
+        if self.source.offline:
+            self.pipeline.use_clock(self.source.clock)
+
+        cv2.namedWindow(self.WINDOW)
+        cv2.setMouseCallback(self.WINDOW, self.mouse_callback)
+
+        # Tk and PIL are only needed once the camera is up
+        with self.startup.phase("ui import"):
+            from checkout_ui import CheckoutUI
+
+        # Wait for the background model load (usually already done by now)
+        with self.startup.phase("wait for model"):
+            self.detector_loader.result()
+            self.model = self.detector.model
+            self.prices = self.detector.catalog
+        if self.shared_frames:
+            self.detector.use_frames(self.frames)
+
+        with self.startup.phase("ui setup"):
+            self.ui = CheckoutUI(self.prices, on_scan=self.capture_photo, on_retry=self.retry_action,
+                                 on_quit=self.quit_action, on_checkout=self.log_checkout)
+        # One camera loop iteration per Tk callback, so the checkout window never blocks it
+        self.ui.run(self.step)
+
+        self.source.stop()
+        self.detector.close()
+        self.snapshots.close()  # Finish writing queued photos
+        self.transactions.close()  # Commit any transactions still queued
+        self.metrics.close()
+        print(f"Frames: {self.frames.stats()}")
+        print(f"Scheduler: {self.scheduler.stats()}")
+        print(f"Motion gate: {self.gate.stats()}")
+        if getattr(self.detector, 'cache', None) is not None:
+            print(f"Detection cache: {self.detector.cache_stats()}")
+        cv2.destroyAllWindows()
+
+    def step(self):
+        timers = self.metrics.metrics
+        # Take ownership of the newest frame; the capture thread won't touch it until the next read
+        started = time.perf_counter()
+        frame = self.frames.read(timeout=0.01)
+        if frame is not None:
+            self.frame = frame
+            waited = time.perf_counter() - started
+            timers['frame_wait_seconds'].observe(waited)
+            # The frame is drawn on in place, so scans take their clean copy before that
+            if self.scan_requested:
+                self.scan_requested = False
+                self.save_scan(frame)
+
+            self.pipeline.process(frame)
+
+            drawing = time.perf_counter()
+            if self.shared_frames and self.frames.held(frame):
+                # A worker or the snapshot writer is still reading the shared slot
+                frame = self.frame = frame.copy()
+            self.update_basket(frame)
+            self.ui.update_basket(self.detected_objects, self.total_price)
+            self.draw_buttons(frame)
+            self.draw_metrics(frame)
+            displaying = time.perf_counter()
+            timers['draw_seconds'].observe(displaying - drawing)
+            cv2.imshow(self.WINDOW, frame)
+
+            if not self.startup.reported:
+                self.startup.mark("first frame")
+                self.startup.reported = True
+                print(self.startup.report())
+        elif self.source.done():
+            # A recorded source ran out
+            self.quit_action()
+            return
+
+        key = cv2.waitKey(1)
+        if frame is not None:
+            finished = time.perf_counter()
+            timers['display_seconds'].observe(finished - displaying)
+            timers['loop_seconds'].observe(finished - started)
+            self.scheduler.record_frame(finished - started - waited)
+        self.handle_key_press(key)
+
+    def process_frame(self, frame):
+        # Synchronous single frame, bypassing the scheduler and the motion gate
+        self.tracker.update(self.detector.detect(frame))
+        self.update_basket(frame)
+
+    def update_basket(self, frame):
+        # Only confirmed tracks count towards the basket, so one missed detection doesn't change the price
+        basket = self.tracker.basket()
+
+        self.detected_objects.clear()
+        self.detected_objects.update(basket['detected_objects'])
+        self.total_price = basket['total_price']
+        self.detections = basket['detections']
+        self.pipeline.render(frame, basket)
+
+    def mouse_callback(self, event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN:
+            if 30 <= x <= 150 and 30 <= y <= 80:
+                self.capture_photo()
+            elif 180 <= x <= 300 and 30 <= y <= 80:
+                self.retry_action()
+            elif 330 <= x <= 450 and 30 <= y <= 80:
+                self.quit_action()
+
+    def handle_key_press(self, key):
+        actions = {
+            ord('c'): self.capture_photo,  # Scan
+            ord('e'): self.retry_action,  # Retry
+            ord('m'): self.toggle_metrics,
+            ord('q'): self.quit_action  # Quit
+        }
+        if key in actions:
+            actions[key]()
+
+    def toggle_metrics(self):
+        self.show_metrics = not self.show_metrics
+
+    def draw_metrics(self, frame):
+        # Live stats to the right of the buttons; the text is rebuilt at most twice a second
+        if not self.show_metrics:
+            return
+        now = time.perf_counter()
+        if now >= self.metrics_refresh:
+            self.metrics_lines = overlay_lines(self.metrics)
+            self.metrics_refresh = now + 0.5
+        draw_metrics(frame, self.metrics_lines)
+
+    def draw_buttons(self, frame):
+        # "Scan", "Retry" and "Quit" are pre-rendered once and copied onto each frame
+        draw_buttons(frame)
+
+    def capture_photo(self):
+        # Saved from the next frame before anything is drawn on it
+        self.scan_requested = True
+
+    def save_scan(self, frame):
+        started = time.perf_counter()
+        # The frame slot gets recycled, so the writer either holds the shared slot until the
+        # photo is written or gets its own copy. Photos are named after their transaction so
+        # they survive restarts.
+        handle = self.frames.retain(frame) if self.shared_frames else None
+        if handle is not None:
+            captured_image = frame
+            done = lambda: self.frames.release(handle)
+        else:
+            captured_image = frame.copy()
+            done = None
+        self.transaction_id = self.transactions.new_id()
+        photo_name = f"detected_photo_{self.transaction_id}"
+        snapshot = self.snapshots.path_for(photo_name)
+        if self.snapshots.submit(photo_name, captured_image, done):
+            print(f"Photo queued: {snapshot}")
+        else:
+            print("Error: Snapshot backlog is full, photo not saved.")
+            snapshot = None
+
+        # Journal the basket as scanned; payments later refer to the same transaction
+        self.scanned_basket = ({name: dict(data) for name, data in self.detected_objects.items()},
+                               self.total_price)
+        self.transactions.record(self.transaction_id, 'scan', *self.scanned_basket, snapshot=snapshot)
+
+        if self.show_scan:
+            cv2.imshow("Captured Photo", captured_image)
+        self.display_price_window()
+        self.photo_count += 1
+        self.metrics.metrics['scans_total'].inc()
+        self.metrics.metrics['capture_photo_seconds'].observe(time.perf_counter() - started)
+
+    def log_checkout(self, event, detected_objects, total_price):
+        # 'checkout', 'qr' or 'cash' from the checkout window, logged against the last scan with
+        # the basket the customer saw on it (it follows the live basket after the scan)
+        if self.transaction_id is not None:
+            self.transactions.record(self.transaction_id, event, detected_objects, total_price)
+
+    def close_scan_window(self):
+        if self.show_scan and cv2.getWindowProperty("Captured Photo", cv2.WND_PROP_VISIBLE) >= 1:
+            cv2.destroyWindow("Captured Photo")
+
+    def retry_action(self):
+        # Close both the price window and the captured photo window
+        self.ui.close_price_window()
+        self.close_scan_window()
+        self.show_price_window = False
+
+    def quit_action(self):
+        self.running = False  # Stop the camera feed
+        self.ui.stop()  # Close the checkout windows and leave the event loop
+        self.close_scan_window()
+
+    def display_price_window(self):
+        # Show (or refresh) the checkout window without blocking the camera loop
+        self.ui.display_price_window(self.detected_objects, self.total_price)
+        self.show_price_window = True
+
+
+class NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def phase(startup, name):
+    # startup.phase(name) when a StartupTimer is given, otherwise nothing
+    return startup.phase(name) if startup is not None else NoPhase()
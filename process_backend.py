@@ -0,0 +1,233 @@
+import os
+import time
+import queue
+import multiprocessing as mp
+import numpy as np
+from multiprocessing import shared_memory
+from checkout_engine import DEFAULT_PRICES
+from catalog import PriceCatalog
+
+
+def inference_worker(tasks, results, engine_kwargs):
+    # Runs in its own process: attach to shared-memory frames, price them, send baskets back
+    from checkout_engine import CheckoutEngine
+
+    engine = CheckoutEngine(**engine_kwargs)
+    engine.warmup()
+    attached = {}
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        # Drain whatever else is already waiting so it goes through the model as one batch
+        batch = [task]
+        while len(batch) < engine.batch_size:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                tasks.put(None)  # Let the outer loop see the stop signal after this batch
+                break
+            batch.append(task)
+
+        frames = []
+        for ticket, slot, name, offset, shape, dtype, submitted_at in batch:
+            if name not in attached:
+                attached[name] = shared_memory.SharedMemory(name=name)
+            frames.append(np.ndarray(shape, dtype=dtype, buffer=attached[name].buf, offset=offset))
+
+        # A bad frame fails its batch, not the worker; the error goes back in place of the baskets
+        error = None
+        try:
+            baskets = engine.process_batch(frames)
+        except Exception as e:
+            baskets = [None] * len(batch)
+            error = f"{type(e).__name__}: {e}"
+        del frames
+        # The parent never sees this process's cache, so its counters travel with the baskets
+        cache_stats = (os.getpid(), engine.cache.stats()) if engine.cache is not None else None
+        for task, basket in zip(batch, baskets):
+            results.put((task[0], task[1], task[-1], basket, cache_stats, error))
+
+    for shm in attached.values():
+        shm.close()
+
+
+class ProcessInferenceBackend:
+    # Drop-in replacement for CheckoutEngine that runs the model in worker processes.
+    # Frames travel through shared memory, baskets come back on a small queue, and the
+    # caller never waits on the model unless it uses process_frame()/process_batch().
+    def __init__(self, workers=1, slots=4, prices=None, **engine_kwargs):
+        ctx = mp.get_context('spawn')  # Don't fork the capture thread and OpenCV state
+        # Each worker gets a copy of the catalog and hot-reloads it from the same file
+        self.catalog = prices if isinstance(prices, PriceCatalog) else \
+            PriceCatalog(DEFAULT_PRICES if prices is None else prices)
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.buffers = [None] * slots
+        self.free_slots = list(range(slots))
+        self.next_ticket = 0
+        self.frame_pool = None  # SharedFramePool the camera reads from, see use_frames()
+        self.handles = {}  # ticket -> frame handle held on the pool while a worker reads it
+        self.unclaimed = []  # (basket, latency) of submit()ted frames that process_batch() collected
+        self.abandoned = set()  # Tickets of a process_batch() that raised; their results are dropped
+        self.worker_cache_stats = {}  # pid -> latest DetectionCache.stats() of that worker
+
+        engine_kwargs['prices'] = self.catalog
+        self.workers = [ctx.Process(target=inference_worker, args=(self.tasks, self.results, engine_kwargs),
+                                    daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def slot_buffer(self, slot, frame):
+        # Reuse the slot's shared memory unless the frame no longer fits
+        shm = self.buffers[slot]
+        if shm is None or shm.size < frame.nbytes:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = self.buffers[slot] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        return shm
+
+    def use_frames(self, pool):
+        # Frames read from this SharedFramePool go to the workers by reference, without a copy
+        self.frame_pool = pool
+
+    def submit(self, frame):
+        # Returns False (and drops the frame) when every slot is still being worked on
+        return self.send(frame) is not None
+
+    def send(self, frame):
+        if not self.free_slots:
+            return None
+
+        slot = self.free_slots.pop()
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        handle = self.frame_pool.retain(frame) if self.frame_pool is not None else None
+        if handle is not None:
+            # Already in shared memory; the pool keeps the slot until the basket comes back
+            self.handles[ticket] = handle
+            name, offset, shape, dtype = self.frame_pool.descriptor(handle)
+        else:
+            shm = self.slot_buffer(slot, frame)
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+            name, offset, shape, dtype = shm.name, 0, frame.shape, frame.dtype.str
+
+        self.tasks.put((ticket, slot, name, offset, shape, dtype, time.perf_counter()))
+        return ticket
+
+    def collect(self, timeout=None):
+        # Finished (ticket, basket, latency, error) tuples; waits up to `timeout` for the first one.
+        # basket is None and error a message when the worker's batch raised
+        finished = []
+        block = timeout is not None
+        while True:
+            try:
+                ticket, slot, submitted_at, basket, cache_stats, error = self.results.get(block, timeout)
+            except queue.Empty:
+                return finished
+            if cache_stats is not None:
+                self.worker_cache_stats[cache_stats[0]] = cache_stats[1]
+            self.free_slots.append(slot)
+            handle = self.handles.pop(ticket, None)
+            if handle is not None:
+                self.frame_pool.release(handle)
+            block = False
+            if ticket in self.abandoned:
+                self.abandoned.discard(ticket)
+                continue
+            finished.append((ticket, basket, time.perf_counter() - submitted_at, error))
+
+    def poll(self, timeout=None):
+        # (basket, latency) per finished frame; basket is None for a frame whose batch failed
+        finished, self.unclaimed = self.unclaimed, []
+        if finished:
+            timeout = None  # Already have something to return; don't wait for more
+        for _, basket, latency, error in self.collect(timeout):
+            if error is not None:
+                print(f"Error: Inference failed: {error}")
+            finished.append((basket, latency))
+        if not finished:
+            self.check_workers()  # Otherwise a dead worker just looks like a slow one
+        return finished
+
+    def cache_stats(self):
+        # The workers' detection caches added up, as of their last baskets
+        totals = {'hits': 0, 'misses': 0, 'expired': 0, 'size': 0}
+        for stats in self.worker_cache_stats.values():
+            for key in totals:
+                totals[key] += stats[key]
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = totals['hits'] / lookups if lookups else 0.0
+        return totals
+
+    def check_workers(self):
+        # A worker that died (bad model, unsupported precision, OOM) would otherwise leave the
+        # synchronous helpers waiting forever
+        for worker in self.workers:
+            if not worker.is_alive():
+                raise RuntimeError(f"Inference worker {worker.pid} exited with code {worker.exitcode}")
+
+    def wait(self, done, tickets):
+        # Collect into `done` the baskets for our own tickets; anything else came from submit()
+        # and is kept for the next poll()
+        finished = self.collect(timeout=1.0)
+        if not finished:
+            self.check_workers()
+        failed = None
+        for ticket, basket, latency, error in finished:
+            if ticket not in tickets:
+                if error is not None:
+                    print(f"Error: Inference failed: {error}")
+                self.unclaimed.append((basket, latency))
+            elif error is not None:
+                failed = error
+            else:
+                done[ticket] = basket
+        if failed is not None:
+            raise RuntimeError(f"Inference failed: {failed}")
+
+    def process_batch(self, frames):
+        # Synchronous helper: keep every slot busy, then put baskets back in frame order
+        done = {}
+        tickets = []
+        mine = set()
+        try:
+            for frame in frames:
+                ticket = self.send(frame)
+                while ticket is None:
+                    self.wait(done, mine)
+                    ticket = self.send(frame)
+                tickets.append(ticket)
+                mine.add(ticket)
+
+            while len(done) < len(tickets):
+                self.wait(done, mine)
+        except RuntimeError:
+            # Nobody will ask for the rest of this batch, so don't hand it to poll() later
+            self.abandoned.update(mine - done.keys())
+            raise
+        return [done[ticket] for ticket in tickets]
+
+    def process_frame(self, frame):
+        return self.process_batch([frame])[0]
+
+    def warmup(self, shape=(720, 960, 3)):
+        # Workers warm themselves up after loading; this waits until they answer
+        self.process_batch([np.zeros(shape, dtype=np.uint8)] * len(self.workers))
+
+    def close(self):
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+
+        for shm in self.buffers:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.buffers = [None] * len(self.buffers)
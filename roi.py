@@ -0,0 +1,86 @@
+import json
+import cv2
+import numpy as np
+from catalog import ZERO
+
+
+class TrayROI:
+    # A checkout tray polygon. Only this region is sent to the model: it is cropped to the
+    # polygon's bounding box, everything outside the polygon is blanked, and the crop is
+    # letterboxed to a fixed square so several trays batch together cleanly.
+    def __init__(self, polygon, name=None, size=640):
+        self.outline = np.array(polygon, dtype=np.int32).reshape(-1, 2)  # As configured
+        self.name = name
+        self.size = size
+        self.frame_size = None  # (height, width) the geometry below was fitted to
+        self.fit(self.outline)
+
+    def fit(self, polygon):
+        self.polygon = polygon
+        self.x, self.y, self.w, self.h = cv2.boundingRect(self.polygon)
+        self.mask = np.zeros((self.h, self.w), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [self.polygon - (self.x, self.y)], 255)
+        self.full_rect = bool(self.mask.all())  # Plain rectangles don't need masking
+
+        # Letterbox geometry is fixed per tray, so work it out once
+        self.scale = self.size / max(self.w, self.h)
+        self.resized = (max(1, round(self.w * self.scale)), max(1, round(self.h * self.scale)))
+        self.left = (self.size - self.resized[0]) // 2
+        self.top = (self.size - self.resized[1]) // 2
+
+    def fit_frame(self, height, width):
+        # Clip the tray to the frame, once per frame size: a polygon drawn to the frame edge
+        # (boundingRect counts both end pixels) or a camera that fell back to a lower
+        # resolution would otherwise not fit
+        clipped = np.clip(self.outline, 0, (width - 1, height - 1)).astype(np.int32)
+        self.fit(clipped)
+        self.frame_size = (height, width)
+
+    def match_frame(self, frame):
+        # Anything that slices frames with x/y/w/h (crop, the detection cache) calls this first
+        if frame.shape[:2] != self.frame_size:
+            self.fit_frame(*frame.shape[:2])
+
+    def crop(self, frame):
+        self.match_frame(frame)
+        region = frame[self.y:self.y + self.h, self.x:self.x + self.w]
+        if not self.full_rect:
+            region = cv2.bitwise_and(region, region, mask=self.mask)
+
+        canvas = np.full((self.size, self.size, frame.shape[2]), 114, dtype=frame.dtype)
+        canvas[self.top:self.top + self.resized[1], self.left:self.left + self.resized[0]] = \
+            cv2.resize(region, self.resized, interpolation=cv2.INTER_AREA)
+        return canvas
+
+    def to_frame(self, boxes):
+        # Map (N, 4) xyxy boxes from letterboxed crop coordinates back to the full frame
+        boxes = (boxes - (self.left, self.top, self.left, self.top)) / self.scale
+        boxes += (self.x, self.y, self.x, self.y)
+        return boxes
+
+    def draw(self, frame, color=(0, 255, 255)):
+        cv2.polylines(frame, [self.polygon], True, color, 2)
+
+
+def load_rois(path, size=640):
+    # JSON list of {"name": ..., "polygon": [[x, y], ...]}
+    with open(path) as f:
+        return [TrayROI(tray['polygon'], tray.get('name'), size) for tray in json.load(f)]
+
+
+def merge_baskets(baskets):
+    # Combine several tray baskets into one basket for the whole camera
+    detected_objects = {}
+    detections = []
+    for basket in baskets:
+        detections.extend(basket['detections'])
+        for name, item in basket['detected_objects'].items():
+            merged = detected_objects.setdefault(name, {'count': 0, 'total': ZERO})
+            merged['count'] += item['count']
+            merged['total'] += item['total']
+
+    return {
+        'detections': detections,
+        'detected_objects': detected_objects,
+        'total_price': sum((item['total'] for item in detected_objects.values()), ZERO)
+    }
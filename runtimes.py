@@ -0,0 +1,105 @@
+import os
+import shutil
+
+# Inference runtimes the checkout engine can use, and the precisions each one supports
+RUNTIMES = {
+    'torch': ('fp32',),
+    'onnx': ('fp32', 'fp16', 'int8'),
+    'openvino': ('fp32', 'fp16', 'int8')
+}
+
+DEFAULT_CACHE_DIR = 'exported_models'
+
+
+def exported_path(model_path, runtime, precision, cache_dir=DEFAULT_CACHE_DIR):
+    # Where the exported artifact for this model/runtime/precision lives in the cache
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    if runtime == 'onnx':
+        return os.path.join(cache_dir, f"{stem}-{precision}.onnx")
+    # Ultralytics recognises OpenVINO models by the "_openvino_model" directory suffix
+    return os.path.join(cache_dir, f"{stem}-{precision}_openvino_model")
+
+
+def copy_onnx_metadata(source, target):
+    # Keep the class names Ultralytics stores in the ONNX metadata after a conversion
+    import onnx
+
+    source_model = onnx.load(source)
+    target_model = onnx.load(target)
+    del target_model.metadata_props[:]
+    target_model.metadata_props.extend(source_model.metadata_props)
+    onnx.save(target_model, target)
+
+
+def export_onnx(model, precision, target):
+    # Export plain FP32 first; FP16 and INT8 are converted from it
+    exported = model.export(format='onnx', dynamic=True, simplify=True)
+    if precision == 'fp32':
+        shutil.move(exported, target)
+        return
+
+    if precision == 'fp16':
+        import onnx
+        from onnxconverter_common import float16
+
+        fp16_model = float16.convert_float_to_float16(onnx.load(exported), keep_io_types=True)
+        onnx.save(fp16_model, target)
+    else:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+
+    copy_onnx_metadata(exported, target)
+    os.remove(exported)
+
+
+def export_openvino(model, precision, target, calibration_data):
+    # INT8 uses NNCF post-training quantization on `calibration_data`
+    exported = model.export(format='openvino', dynamic=True, half=precision == 'fp16',
+                            int8=precision == 'int8', data=calibration_data)
+    shutil.move(exported, target)
+
+
+def export_model(model_path='yolov8n.pt', runtime='onnx', precision='fp32', cache_dir=DEFAULT_CACHE_DIR,
+                 calibration_data='coco8.yaml'):
+    # Export once and reuse the artifact from the cache on later runs
+    if runtime not in RUNTIMES or runtime == 'torch':
+        raise ValueError(f"Unknown export runtime: {runtime}")
+    if precision not in RUNTIMES[runtime]:
+        raise ValueError(f"{runtime} does not support {precision}")
+
+    target = exported_path(model_path, runtime, precision, cache_dir)
+    if os.path.exists(target):
+        return target
+
+    from ultralytics import YOLO
+
+    os.makedirs(cache_dir, exist_ok=True)
+    model = YOLO(model_path)
+    print(f"Exporting {model_path} to {runtime} ({precision}), this only happens once...")
+    if runtime == 'onnx':
+        export_onnx(model, precision, target)
+    else:
+        export_openvino(model, precision, target, calibration_data)
+    return target
+
+
+def load_model(model_path='yolov8n.pt', runtime='torch', precision='fp32', cache_dir=DEFAULT_CACHE_DIR):
+    # Same YOLO object either way, so results, names and the rest of the pipeline don't change.
+    # Ultralytics (and torch) are only imported here, the first time a model is actually needed.
+    from ultralytics import YOLO
+
+    if runtime == 'torch':
+        if precision != 'fp32':
+            raise ValueError("The torch runtime only runs fp32 on the CPU")
+        return YOLO(model_path)
+    return YOLO(export_model(model_path, runtime, precision, cache_dir), task='detect')
+
+
+if __name__ == "__main__":
+    # Pre-build every CPU variant, e.g. while provisioning a kiosk image
+    for runtime, precisions in RUNTIMES.items():
+        if runtime == 'torch':
+            continue
+        for precision in precisions:
+            print(export_model('yolov8n.pt', runtime, precision))
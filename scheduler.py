@@ -0,0 +1,95 @@
+import math
+import time
+import numpy as np
+from collections import deque
+
+
+class AdaptiveScheduler:
+    # Decides which frames get a model call, based on measured inference latency and frame rate.
+    # Runs inference once every `interval` frames, where the interval is the smallest one that
+    # still reaches `target_fps` on screen, capped so detections are never older than `max_staleness`.
+    # Offline runs (see Pipeline.use_clock) switch to a media-time clock and a fixed interval so
+    # the frames that get priced don't depend on how fast the machine is.
+    def __init__(self, target_fps=30, max_staleness=0.5, window=120, clock=time.perf_counter):
+        self.target_fps = target_fps
+        self.clock = clock
+        self.adaptive = True
+        self.max_staleness = max_staleness
+        self.latencies = deque(maxlen=window)  # Seconds per model call
+        self.frame_costs = deque(maxlen=window)  # Seconds of work per skipped frame (see record_frame)
+        self.tick_times = deque(maxlen=window)  # When each frame was scheduled
+        self.interval = 1
+        self.countdown = 0
+        self.last_inferred = False
+        self.frames = 0
+        self.inferred = 0
+
+    def tick(self):
+        # Call once per frame; returns True when this frame should run inference
+        self.tick_times.append(self.clock())
+        self.frames += 1
+
+        self.last_inferred = self.countdown <= 0
+        if self.last_inferred:
+            self.countdown = self.interval
+            self.inferred += 1
+        self.countdown -= 1
+        return self.last_inferred
+
+    def skip(self):
+        # The frame tick() picked did not reach the model after all (motion gate, busy backend);
+        # count it as a shown-only frame and let the next frame try again
+        if self.last_inferred:
+            self.last_inferred = False
+            self.inferred -= 1
+            self.countdown = 0
+
+    def record_frame(self, seconds):
+        # Work done on the last frame outside the model (tracking, drawing, display), without the
+        # wait for the next frame; that wait is the camera's frame period, not a cost
+        if not self.last_inferred:
+            self.frame_costs.append(seconds)
+
+    def record_inference(self, seconds):
+        self.latencies.append(seconds)
+        if self.adaptive:
+            self.interval = self.compute_interval()
+
+    def compute_interval(self):
+        if not self.latencies:
+            return 1
+
+        latency = float(np.median(self.latencies))
+        target = self.target_fps
+
+        # Frames can't be shown faster than they arrive
+        if self.frame_costs:
+            frame_cost = float(np.median(self.frame_costs))
+            if frame_cost > 0:
+                target = min(target, 0.95 / frame_cost)
+        else:
+            frame_cost = 0.0
+
+        # k frames take latency + k * frame_cost; pick the smallest k that reaches the target rate
+        headroom = max(1.0 - frame_cost * target, 0.05)
+        interval = math.ceil(latency * target / headroom)
+
+        # Don't let the overlay go staler than max_staleness
+        max_interval = max(1, int(self.max_staleness * target))
+        return max(1, min(interval, max_interval))
+
+    def percentile(self, q):
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, q)) * 1000
+
+    def stats(self):
+        elapsed = self.tick_times[-1] - self.tick_times[0] if len(self.tick_times) > 1 else 0.0
+        return {
+            'interval': self.interval,
+            'skip_rate': 1.0 - self.inferred / self.frames if self.frames else 0.0,
+            'fps': (len(self.tick_times) - 1) / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': self.percentile(50),
+            'latency_p95_ms': self.percentile(95),
+            'latency_p99_ms': self.percentile(99)
+        }
@@ -0,0 +1,248 @@
+import time
+import threading
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+
+GENERATION = 0  # Header columns, one row per slot
+SEQ = 1
+ALIGN = 64
+
+
+class SharedFramePool:
+    # Drop-in for FrameRingBuffer whose slots live in one shared-memory block, so a frame can be
+    # handed to other processes (detector workers, a recorder) by reference instead of by copy.
+    #
+    # Every slot has a reference count and a generation. The camera loop's read() holds one
+    # reference; retain() adds one for another consumer and returns a (slot, generation) handle
+    # that travels to the other process together with descriptor(). The capture thread only
+    # writes into slots nobody references, and bumps the slot's generation when it does, so a
+    # stale handle can never be mistaken for the frame that replaced it. Reference counts are
+    # kept in the owning process; consumers elsewhere give their handle back to it to release.
+    #
+    # The block is allocated on the first frame; later frames of another size are resized to it.
+    # Consumers must treat the frames as read-only while someone else may hold them.
+    WRITING = -1
+
+    def __init__(self, slots=8, mode='latest'):
+        if mode not in ('latest', 'every'):
+            raise ValueError(f"Unknown ring buffer mode: {mode}")
+        if slots < 3:
+            raise ValueError("SharedFramePool needs at least 3 slots")
+
+        self.mode = mode
+        self.count = slots
+        self.shm = None
+        self.header = None  # (slots, 2) int64 generation/seq table at the start of the block
+        self.views = [None] * slots  # One ndarray per slot, created once
+        self.shape = None
+        self.dtype = None
+        self.offset = 0  # Where the first frame starts in the block
+        self.stride = 0  # Bytes from one slot to the next
+        self.refs = [0] * slots  # References held on each slot (WRITING while being filled)
+        self.seqs = [0] * slots
+        self.stamps = [0.0] * slots
+        self.lock = threading.Lock()
+        self.latest = -1
+        self.write_seq = 0
+        self.read_seq = 0
+        self.reading = -1
+        self.closed = False
+
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+
+        self.seq = 0
+        self.timestamp = 0.0
+
+    def allocate(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(shape)) * dtype.itemsize
+        stride = -(-frame_bytes // ALIGN) * ALIGN
+        self.offset = -(-self.count * 2 * 8 // ALIGN) * ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=self.offset + stride * self.count)
+        self.header = np.ndarray((self.count, 2), dtype=np.int64, buffer=self.shm.buf)
+        self.header[...] = 0
+        self.views = [np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=self.offset + stride * i)
+                      for i in range(self.count)]
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.stride = stride
+
+    # Producer side
+
+    def claim_write_slot(self):
+        while not self.closed:
+            with self.lock:
+                # The oldest slot nobody holds; 'every' also keeps frames the loop hasn't read yet
+                best = -1
+                for idx in range(self.count):
+                    if self.refs[idx] != 0 or idx == self.latest:
+                        continue
+                    if self.mode == 'every' and self.seqs[idx] > self.read_seq:
+                        continue
+                    if best < 0 or self.seqs[idx] < self.seqs[best]:
+                        best = idx
+                if best >= 0:
+                    self.refs[best] = self.WRITING
+                    return best
+            time.sleep(0.001)
+        return None
+
+    def publish(self, idx):
+        with self.lock:
+            seq = self.write_seq + 1
+            self.header[idx, GENERATION] += 1
+            self.header[idx, SEQ] = seq
+            self.seqs[idx] = seq
+            self.stamps[idx] = time.perf_counter()
+            self.refs[idx] = 0
+            self.latest = idx
+            self.write_seq = seq
+            self.captured += 1
+
+    def abandon(self, idx):
+        with self.lock:
+            self.refs[idx] = 0
+
+    def store(self, idx, frame):
+        slot = self.views[idx]
+        if frame is slot:
+            return
+        if frame.shape != slot.shape:
+            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+        else:
+            slot[...] = frame
+
+    def write_from(self, cap):
+        # cv2 decodes straight into the shared slot once the block exists
+        if self.shm is None:
+            ret, frame = cap.read()
+            return ret and self.write(frame)
+
+        idx = self.claim_write_slot()
+        if idx is None:
+            return False
+        ret, frame = cap.read(self.views[idx])
+        if not ret:
+            self.abandon(idx)
+            return False
+        self.store(idx, frame)
+        self.publish(idx)
+        return True
+
+    def write(self, frame):
+        if self.shm is None:
+            self.allocate(frame.shape, frame.dtype)
+        idx = self.claim_write_slot()
+        if idx is None:
+            return False
+        self.store(idx, frame)
+        self.publish(idx)
+        return True
+
+    def close(self):
+        self.closed = True
+
+    # Consumer side (the camera loop)
+
+    def read(self, timeout=0.0):
+        # The next frame without copying; the loop holds it until the next read() or release()
+        self.release()
+        deadline = time.perf_counter() + timeout
+
+        while True:
+            with self.lock:
+                idx = -1
+                if self.mode == 'every':
+                    seq = self.read_seq + 1
+                    if seq <= self.write_seq:
+                        idx = self.seqs.index(seq) if seq in self.seqs else -1
+                elif self.write_seq > self.read_seq:
+                    seq, idx = self.write_seq, self.latest
+
+                if idx >= 0:
+                    self.refs[idx] += 1
+                    self.reading = idx
+                    self.dropped += seq - self.read_seq - 1
+                    self.processed += 1
+                    self.read_seq = self.seq = seq
+                    self.timestamp = self.stamps[idx]
+                    return self.views[idx]
+
+            if self.closed or time.perf_counter() >= deadline:
+                return None
+            time.sleep(0.001)
+
+    def release(self, handle=None):
+        # Without a handle: the loop's current frame. With one: a reference from retain().
+        with self.lock:
+            if handle is None:
+                if self.reading >= 0:
+                    self.refs[self.reading] -= 1
+                    self.reading = -1
+                return
+            if self.header is None:
+                return  # Already unlinked
+            slot, generation = handle
+            # The loop's own reference (from read()) can't be released through a handle
+            held = self.refs[slot] - (1 if slot == self.reading else 0)
+            if self.header[slot, GENERATION] != generation or held <= 0:
+                raise ValueError(f"Stale frame handle: {handle}")
+            self.refs[slot] -= 1
+
+    # Sharing with other consumers
+
+    def slot_of(self, frame):
+        for idx, view in enumerate(self.views):
+            if frame is view:
+                return idx
+        return -1
+
+    def retain(self, frame):
+        # Another reference to a frame from read(); None if `frame` is not one of ours
+        idx = self.slot_of(frame)
+        if idx < 0:
+            return None
+        with self.lock:
+            if self.refs[idx] <= 0:
+                return None
+            self.refs[idx] += 1
+            return idx, int(self.header[idx, GENERATION])
+
+    def held(self, frame):
+        # True while a consumer other than the camera loop (a worker, a recorder) holds `frame`;
+        # until then the loop can draw on it in place
+        idx = self.slot_of(frame)
+        if idx < 0:
+            return False
+        with self.lock:
+            return self.refs[idx] > (1 if idx == self.reading else 0)
+
+    def descriptor(self, handle):
+        # Everything another process needs to map the frame: (shm name, byte offset, shape, dtype)
+        return self.shm.name, self.offset + self.stride * handle[0], self.shape, self.dtype.str
+
+    def stats(self):
+        with self.lock:
+            held = sum(1 for refs in self.refs if refs > 0)
+        return {
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'processed': self.processed,
+            'pending': self.write_seq - self.read_seq,
+            'held': held
+        }
+
+    def unlink(self):
+        # Called by the owner once capture has stopped; the block goes away when the last view does
+        if self.shm is None:
+            return
+        self.header = None
+        self.views = [None] * self.count
+        self.shm.unlink()
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Someone still has a frame; the mapping is freed with it
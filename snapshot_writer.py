@@ -0,0 +1,123 @@
+import os
+import queue
+import threading
+import cv2
+
+# cv2 encoder option used for the `quality` setting of each format
+QUALITY_FLAGS = {
+    '.jpg': cv2.IMWRITE_JPEG_QUALITY,
+    '.jpeg': cv2.IMWRITE_JPEG_QUALITY,
+    '.webp': cv2.IMWRITE_WEBP_QUALITY,
+    '.png': cv2.IMWRITE_PNG_COMPRESSION
+}
+
+
+class SnapshotWriter:
+    # Encodes and saves scan snapshots on a background thread so a scan never waits on the disk.
+    # fsync: 'never' leaves flushing to the OS, 'always' syncs every file, 'batch' syncs once
+    # whenever the backlog runs empty.
+    def __init__(self, directory='.', ext='.jpg', quality=90, max_backlog=8, fsync='batch'):
+        if fsync not in ('never', 'always', 'batch'):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.directory = directory
+        self.ext = ext if ext.startswith('.') else f'.{ext}'
+        self.params = [QUALITY_FLAGS[self.ext], quality] if self.ext in QUALITY_FLAGS else []
+        self.fsync = fsync
+        self.backlog = queue.Queue(maxsize=max_backlog)
+        self.pending_sync = []
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, name, frame, done=None):
+        # The frame must not change afterwards; returns False when the backlog is full.
+        # done() is called once the writer no longer needs the frame (e.g. to release a
+        # SharedFramePool handle), whether it was saved or not.
+        try:
+            self.backlog.put_nowait((name, frame, done))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if done is not None:
+                done()
+            return False
+
+    def path_for(self, name):
+        return os.path.join(self.directory, f"{name}{self.ext}")
+
+    def run(self):
+        while True:
+            item = self.backlog.get()
+            if item is None:
+                break
+            name, frame, done = item
+            self.save(name, frame)
+            if done is not None:
+                done()
+            if self.fsync == 'batch' and self.backlog.empty():
+                self.sync_pending()
+        self.sync_pending()
+
+    def save(self, name, frame):
+        path = self.path_for(name)
+        ok, encoded = cv2.imencode(self.ext, frame, self.params)
+        if not ok:
+            print(f"Error: Could not encode snapshot {path}")
+            self.errors += 1
+            return
+
+        # Write to a temporary file and rename so a crash never leaves a half-written snapshot
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(encoded.tobytes())
+                if self.fsync == 'always':
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            if self.fsync == 'always':
+                self.sync_path(self.directory)  # Make the rename itself durable
+        except OSError as e:
+            print(f"Error saving snapshot {path}: {e}")
+            self.errors += 1
+            return
+
+        if self.fsync == 'batch':
+            self.pending_sync.append(path)
+        self.written += 1
+
+    def sync_path(self, path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def sync_pending(self):
+        if not self.pending_sync:
+            return
+        try:
+            for path in self.pending_sync:
+                self.sync_path(path)
+            self.sync_path(self.directory)
+        except OSError as e:
+            print(f"Error syncing snapshots: {e}")
+        self.pending_sync = []
+
+    def stats(self):
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'backlog': self.backlog.qsize()
+        }
+
+    def close(self):
+        # Finish everything already queued, then stop the thread
+        self.backlog.put(None)
+        self.thread.join()
@@ -0,0 +1,61 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    # Collects how long each startup phase took, including phases that run on other threads
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []  # (name, start offset, seconds)
+        self.lock = threading.Lock()
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.phases.append((name, start - self.started, end - start))
+
+    def mark(self, name):
+        # A zero-length phase, e.g. "first frame shown"
+        with self.lock:
+            self.phases.append((name, time.perf_counter() - self.started, 0.0))
+
+    def report(self):
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        lines = ["Startup timing:"]
+        for name, offset, seconds in phases:
+            lines.append(f"  {name:<20} at {offset * 1000:8.1f} ms  took {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+class BackgroundLoader:
+    # Runs a slow factory (e.g. model load + warm-up) on a thread; result() waits for it
+    def __init__(self, factory):
+        self.value = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(factory,), daemon=True)
+        self.thread.start()
+
+    def run(self, factory):
+        try:
+            self.value = factory()
+        except BaseException as e:
+            self.error = e
+
+    def ready(self):
+        return not self.thread.is_alive()
+
+    def result(self, timeout=None):
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            raise TimeoutError("Background load did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.value
@@ -0,0 +1,272 @@
+import time
+from decimal import Decimal
+import cv2
+import numpy as np
+import pytest
+from pipeline import Pipeline, YoloDetector
+from tracker import IoUTracker
+from motion_gate import MotionGate
+from scheduler import AdaptiveScheduler
+from frame_source import FrameSource
+from catalog import ZERO, PriceCatalog
+from roi import TrayROI, merge_baskets
+from detection_cache import DetectionCache
+from transaction_log import TransactionLog
+from shared_frames import SharedFramePool
+from snapshot_writer import SnapshotWriter
+
+
+class StubDetector:
+    # Reports the items of whichever scene the frame shows (pixel (0, 0) is the scene id)
+    def __init__(self, scenes):
+        self.scenes = scenes
+        self.results = []
+        self.calls = 0
+
+    def submit(self, frame):
+        self.calls += 1
+        self.results.append((list(self.scenes[int(frame[0, 0, 0])]), 0.01))
+        return True
+
+    def poll(self):
+        results, self.results = self.results, []
+        return results
+
+
+def item(x, price='1.00'):
+    return {'box': (x, 100, x + 80, 180), 'conf': 0.9, 'class_name': 'apple', 'price': Decimal(price)}
+
+
+def scene_frame(scene_id):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    frame[40:200, 40:280] = 60 + 80 * scene_id  # Visible change between scenes
+    frame[0, 0, 0] = scene_id
+    return frame
+
+
+def test_item_removed_from_static_scene_leaves_basket():
+    detector = StubDetector({0: [item(50), item(150)], 1: []})
+    tracker = IoUTracker(min_hits=3, max_misses=5)
+    # No max_idle refresh during the test, so only the settle logic can clear the basket
+    pipeline = Pipeline(detector, tracker, gate=MotionGate(max_idle=1000.0))
+
+    for _ in range(20):
+        basket = pipeline.process(scene_frame(0))
+    assert basket['detected_objects']['apple']['count'] == 2
+
+    for _ in range(20):
+        basket = pipeline.process(scene_frame(1))
+    assert basket['detections'] == []
+    assert tracker.tracks == []
+
+
+def test_gate_skips_static_scene_once_settled():
+    detector = StubDetector({0: [item(50)]})
+    pipeline = Pipeline(detector, IoUTracker(min_hits=3), gate=MotionGate(max_idle=1000.0))
+
+    for _ in range(50):
+        basket = pipeline.process(scene_frame(0))
+    assert basket['detected_objects']['apple']['count'] == 1
+    assert detector.calls < 10
+
+
+class BusyDetector(StubDetector):
+    # Turns down the first `busy` submits, like a process or remote backend with no free slot
+    def __init__(self, scenes, busy):
+        super().__init__(scenes)
+        self.busy = busy
+
+    def submit(self, frame):
+        if self.busy > 0:
+            self.busy -= 1
+            return False
+        return super().submit(frame)
+
+
+def test_change_rejected_by_busy_backend_is_retried():
+    detector = StubDetector({0: [item(50)], 1: []})
+    tracker = IoUTracker(min_hits=3, max_misses=5)
+    pipeline = Pipeline(detector, tracker, gate=MotionGate(max_idle=1000.0))
+    for _ in range(20):
+        pipeline.process(scene_frame(0))
+
+    # The frames showing the removal are turned down at first
+    busy = BusyDetector(detector.scenes, busy=5)
+    pipeline.detector = busy
+    for _ in range(20):
+        basket = pipeline.process(scene_frame(1))
+    assert busy.calls > 0
+    assert basket['detections'] == []
+
+
+def test_scheduler_counts_gate_skips():
+    detector = StubDetector({0: [item(50)]})
+    scheduler = AdaptiveScheduler()
+    pipeline = Pipeline(detector, IoUTracker(min_hits=3), scheduler, MotionGate(max_idle=1000.0))
+    for _ in range(40):
+        pipeline.process(scene_frame(0))
+        scheduler.record_frame(0.001)  # As CheckoutCamera.step does after drawing
+
+    assert scheduler.inferred == detector.calls
+    assert scheduler.stats()['skip_rate'] == 1.0 - detector.calls / 40
+    assert len(scheduler.frame_costs) == 40 - detector.calls
+
+
+class SlowAsyncDetector(StubDetector):
+    # One frame in flight; its result shows up `delay` seconds later, like a worker process
+    def __init__(self, scenes, delay):
+        super().__init__(scenes)
+        self.delay = delay
+        self.in_flight = None
+
+    def submit(self, frame):
+        if self.in_flight is not None:
+            return False
+        self.calls += 1
+        self.in_flight = (list(self.scenes[int(frame[0, 0, 0])]), time.perf_counter() + self.delay)
+        return True
+
+    def poll(self):
+        if self.in_flight is None or time.perf_counter() < self.in_flight[1]:
+            return []
+        detections, self.in_flight = self.in_flight[0], None
+        return [(detections, self.delay)]
+
+
+def reprice(folder, delay):
+    source = FrameSource(str(folder), pacing='fast')
+    detector = SlowAsyncDetector({0: [item(50)], 1: [item(50), item(150)], 2: []}, delay)
+    pipeline = Pipeline(detector, IoUTracker(min_hits=3), AdaptiveScheduler(),
+                        MotionGate(max_idle=0.5))
+    pipeline.use_clock(source.clock)
+    baskets = []
+    while not source.done():
+        frame = source.frames.read(timeout=0.05)
+        if frame is not None:
+            baskets.append(pipeline.process(frame)['total_price'])
+    source.stop()
+    return detector.calls, baskets
+
+
+def test_offline_repricing_does_not_depend_on_machine_speed(tmp_path):
+    for i, scene in enumerate([0] * 15 + [1] * 15 + [2] * 15):
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), scene_frame(scene))
+
+    assert reprice(tmp_path, 0.0) == reprice(tmp_path, 0.005)
+
+
+def test_remote_backend_rejects_local_only_options():
+    with pytest.raises(ValueError, match='rois, prices'):
+        YoloDetector(backend='remote', rois=[object()], prices={'apple': '1.00'})
+    YoloDetector(backend='remote')  # Nothing is contacted until load()
+
+
+def test_empty_basket_total_is_decimal():
+    basket = Pipeline(StubDetector({0: []}), IoUTracker()).process(scene_frame(0))
+    assert basket['total_price'] == ZERO and isinstance(basket['total_price'], Decimal)
+    assert str(merge_baskets([])['total_price']) == '0.00'
+
+
+class FailingDetector(StubDetector):
+    # Like RemoteEngine when a request fails: the frame comes back with no detections
+    def submit(self, frame):
+        self.calls += 1
+        self.results.append((None, 0.01))
+        return True
+
+
+class SilentDetector(StubDetector):
+    # A backend whose worker died: frames go in, nothing ever comes back
+    def submit(self, frame):
+        self.calls += 1
+        return True
+
+
+def test_lockstep_moves_on_after_a_failed_frame():
+    pipeline = Pipeline(FailingDetector({}), IoUTracker())
+    pipeline.use_clock(lambda: 0.0)
+    assert pipeline.process(scene_frame(0))['detections'] == []
+    assert not pipeline.waiting
+
+
+def test_lockstep_gives_up_on_a_silent_detector():
+    pipeline = Pipeline(SilentDetector({}), IoUTracker())
+    pipeline.use_clock(lambda: 0.0)
+    pipeline.timeout = 0.05
+    with pytest.raises(TimeoutError):
+        pipeline.process(scene_frame(0))
+
+    pipeline = Pipeline(BusyDetector({0: []}, busy=10 ** 9), IoUTracker())
+    pipeline.use_clock(lambda: 0.0)
+    pipeline.timeout = 0.05
+    with pytest.raises(TimeoutError):
+        pipeline.process(scene_frame(0))
+
+
+class LockedLog(TransactionLog):
+    # The first commits fail, as with "database is locked" while other lanes write
+    def write(self, conn, rows):
+        if self.errors < 2:
+            self.errors += 1
+            return False
+        return super().write(conn, rows)
+
+
+def test_transaction_log_retries_failed_commits(tmp_path):
+    log = LockedLog(str(tmp_path / 'transactions.db'), retry_delay=0.01)
+    log.record('t1', 'cash', {'apple': {'count': 1, 'total': Decimal('1.00')}}, Decimal('1.00'))
+    log.close()
+    assert [event['event'] for event in log.history('t1')] == ['cash']
+    assert log.stats()['lost'] == 0
+
+
+def test_scheduler_recovers_after_idle_stretch():
+    # 30 fps camera, 5 ms model, 2 ms of drawing per frame; the motion gate skips the model for a
+    # while, then the scene changes and every frame could be detected again
+    now = [0.0]
+    scheduler = AdaptiveScheduler(target_fps=30, clock=lambda: now[0])
+    for frame in range(300):
+        now[0] += 1 / 30
+        if scheduler.tick():
+            if frame < 150:
+                scheduler.skip()
+            else:
+                scheduler.record_inference(0.005)
+        scheduler.record_frame(0.002)
+    assert scheduler.interval == 1
+
+
+def test_cache_key_clips_trays_past_the_frame_edge():
+    tray = TrayROI([[-20, -10], [300, -10], [300, 300]])
+    key = DetectionCache().key(scene_frame(0), [tray])
+    assert len(key) == 1 and (tray.x, tray.y) == (0, 0)
+
+
+def test_snapshot_writer_holds_shared_frame_until_written(tmp_path):
+    pool = SharedFramePool(slots=3)
+    pool.write(scene_frame(1))
+    frame = pool.read()
+    assert not pool.held(frame)  # Only the camera loop has it, so it can be drawn on in place
+
+    handle = pool.retain(frame)
+    writer = SnapshotWriter(str(tmp_path))
+    writer.submit('scan', frame, lambda: pool.release(handle))
+    assert pool.held(frame) or writer.written == 1
+    writer.close()
+    assert not pool.held(frame)
+    assert (tmp_path / 'scan.jpg').exists()
+    pool.release()
+    pool.unlink()
+
+
+def test_catalog_rejects_prices_it_cannot_charge(tmp_path):
+    for price in ('NaN', 'Infinity', '-1.00', '1.005'):
+        with pytest.raises(ValueError):
+            PriceCatalog({'apple': price})
+
+    path = tmp_path / 'prices.csv'
+    path.write_text("name,price\napple,1.50\n")
+    catalog = PriceCatalog(str(path))
+    path.write_text("name,price\napple,NaN\n")
+    assert not catalog.reload()
+    assert catalog['apple'] == Decimal('1.50')
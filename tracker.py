@@ -0,0 +1,159 @@
+import numpy as np
+from catalog import ZERO
+
+
+def iou_matrix(boxes_a, boxes_b):
+    # Pairwise intersection-over-union between two (N, 4) and (M, 4) xyxy arrays
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)))
+
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def greedy_match(scores, min_score):
+    # Pair rows with columns by best score first; good enough for a handful of items
+    pairs = []
+    if scores.size == 0:
+        return pairs
+
+    scores = scores.copy()
+    while True:
+        row, col = np.unravel_index(np.argmax(scores), scores.shape)
+        if scores[row, col] < min_score:
+            return pairs
+        pairs.append((row, col))
+        scores[row, :] = -np.inf
+        scores[:, col] = -np.inf
+
+
+class Track:
+    def __init__(self, track_id, detection):
+        self.track_id = track_id
+        self.box = np.array(detection['box'], dtype=np.float64)
+        self.last_box = self.box.copy()  # Box at the last detector run
+        self.velocity = np.zeros(4)  # Box change per frame
+        self.class_name = detection['class_name']
+        self.price = detection['price']
+        self.conf = detection['conf']
+        self.hits = 1  # Detector frames this track was matched on
+        self.misses = 0  # Consecutive detector frames without a match
+        self.frames_since_update = 0
+
+
+class IoUTracker:
+    # Gives detections persistent ids across frames so the basket doesn't flicker.
+    # A track joins the basket after `min_hits` matches and leaves it after `max_misses`
+    # detector runs in a row without a match. Between detector runs predict() moves
+    # boxes along their last velocity.
+    def __init__(self, iou_threshold=0.3, centroid_ratio=0.5, min_hits=3, max_misses=5):
+        self.iou_threshold = iou_threshold
+        self.centroid_ratio = centroid_ratio
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.tracks = []
+        self.next_id = 1
+
+    def predict(self):
+        for track in self.tracks:
+            track.box += track.velocity
+            track.frames_since_update += 1
+
+    def update(self, detections):
+        boxes = np.array([det['box'] for det in detections], dtype=np.float64).reshape(-1, 4)
+        track_boxes = np.array([track.box for track in self.tracks], dtype=np.float64).reshape(-1, 4)
+
+        # Only the same class can continue a track
+        same_class = np.array([[track.class_name == det['class_name'] for det in detections]
+                               for track in self.tracks], dtype=bool).reshape(len(self.tracks), len(detections))
+
+        # First match on overlap, then fall back to centroid distance for fast-moving items
+        scores = np.where(same_class, iou_matrix(track_boxes, boxes), -np.inf)
+        pairs = greedy_match(scores, self.iou_threshold)
+
+        matched_tracks = {row for row, _ in pairs}
+        matched_dets = {col for _, col in pairs}
+        rows = [row for row in range(len(self.tracks)) if row not in matched_tracks]
+        cols = [col for col in range(len(detections)) if col not in matched_dets]
+        if rows and cols:
+            track_centers = (track_boxes[rows, :2] + track_boxes[rows, 2:]) / 2
+            det_centers = (boxes[cols, :2] + boxes[cols, 2:]) / 2
+            dist = np.linalg.norm(track_centers[:, None, :] - det_centers[None, :, :], axis=2)
+            diag = np.linalg.norm(track_boxes[rows, 2:] - track_boxes[rows, :2], axis=1)[:, None]
+            closeness = np.where(same_class[np.ix_(rows, cols)], 1.0 - dist / np.maximum(diag * self.centroid_ratio, 1e-9), -np.inf)
+            pairs += [(rows[r], cols[c]) for r, c in greedy_match(closeness, 0.0)]
+
+        for row, col in pairs:
+            track, det = self.tracks[row], detections[col]
+            new_box = np.array(det['box'], dtype=np.float64)
+            steps = track.frames_since_update + 1
+            track.velocity = 0.5 * track.velocity + 0.5 * (new_box - track.last_box) / steps
+            track.box = new_box
+            track.last_box = new_box.copy()
+            track.conf = det['conf']
+            track.price = det['price']
+            track.hits += 1
+            track.misses = 0
+            track.frames_since_update = 0
+
+        matched_tracks = {row for row, _ in pairs}
+        matched_dets = {col for _, col in pairs}
+
+        survivors = []
+        for row, track in enumerate(self.tracks):
+            if row not in matched_tracks:
+                # Hold a missed track where it is instead of letting it drift away
+                track.misses += 1
+                track.frames_since_update = 0
+                track.velocity[:] = 0
+                track.last_box = track.box.copy()
+            if track.misses <= self.max_misses:
+                survivors.append(track)
+
+        for col, det in enumerate(detections):
+            if col not in matched_dets:
+                survivors.append(Track(self.next_id, det))
+                self.next_id += 1
+
+        self.tracks = survivors
+
+    def confirmed(self):
+        return [track for track in self.tracks if track.hits >= self.min_hits]
+
+    def settled(self):
+        # True once every track is confirmed and was matched by the last detector run, i.e. the
+        # basket won't change without new detections (the motion gate may stop feeding us)
+        return all(track.hits >= self.min_hits and track.misses == 0 for track in self.tracks)
+
+    def basket(self):
+        # Same shape as CheckoutEngine baskets, built from confirmed tracks only
+        detected_objects = {}
+        detections = []
+        for track in self.confirmed():
+            detections.append({
+                'box': tuple(int(v) for v in track.box),
+                'conf': track.conf,
+                'class_name': track.class_name,
+                'price': track.price,
+                'track_id': track.track_id
+            })
+            if track.price is not None:
+                item = detected_objects.setdefault(track.class_name, {'count': 0, 'total': ZERO})
+                item['count'] += 1
+                item['total'] = item['count'] * track.price
+
+        return {
+            'detections': detections,
+            'detected_objects': detected_objects,
+            'total_price': sum((item['total'] for item in detected_objects.values()), ZERO)
+        }
+
+    def reset(self):
+        self.tracks = []
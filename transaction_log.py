@@ -0,0 +1,151 @@
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    lane TEXT,
+    created_at REAL NOT NULL,
+    total TEXT NOT NULL,
+    items TEXT NOT NULL,
+    snapshot TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_by_id ON transactions (transaction_id);
+"""
+
+
+class TransactionLog:
+    # Append-only journal of scans and payments in SQLite (WAL mode, synchronous=FULL, so a
+    # committed batch survives a power cut). record() only queues the row; a background thread
+    # writes everything that is waiting in one transaction, so lanes never wait on the disk.
+    # Several processes can share one file: WAL lets them append while others read. A batch
+    # whose commit fails (e.g. "database is locked" while other lanes commit) stays queued and
+    # is retried every retry_delay seconds; only at close() is it given up after a few attempts.
+    def __init__(self, path='transactions.db', max_batch=256, max_backlog=10000, retry_delay=0.5,
+                 close_retries=5):
+        self.path = path
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+        self.close_retries = close_retries
+        self.backlog = queue.Queue(maxsize=max_backlog)
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0  # Failed commits, each retried
+        self.lost = 0  # Rows still failing when the log was closed
+
+        # Create the schema up front so a bad path fails here rather than on the writer thread
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def new_id(self):
+        # Unique across restarts and lanes, so snapshots named after it are never overwritten
+        return uuid.uuid4().hex
+
+    def record(self, transaction_id, event, detected_objects, total_price, snapshot=None, lane=None):
+        # Thread-safe; returns False when the backlog is full and the row was dropped
+        items = {name: {'count': data['count'], 'total': str(data['total'])}
+                 for name, data in detected_objects.items()}
+        row = (transaction_id, event, None if lane is None else str(lane), time.time(),
+               str(total_price), json.dumps(items), snapshot)
+        try:
+            self.backlog.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"Error: Transaction backlog is full, {event} for {transaction_id} not logged.")
+            return False
+
+    def run(self):
+        conn = self.connect()
+        rows = []  # Not committed yet; a batch that failed stays here until it goes through
+        stopping = False
+        attempts = 0
+        while True:
+            if not rows:
+                row = self.backlog.get()
+                if row is None:
+                    break
+                rows.append(row)
+
+            # Take whatever else is already waiting and commit it all at once
+            while len(rows) < self.max_batch and not stopping:
+                try:
+                    row = self.backlog.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                rows.append(row)
+
+            if self.write(conn, rows):
+                rows = []
+                if stopping:
+                    break
+                continue
+            if stopping:
+                attempts += 1
+                if attempts > self.close_retries:
+                    print(f"Error: Gave up on {len(rows)} transactions at shutdown.")
+                    self.lost += len(rows)
+                    break
+            time.sleep(self.retry_delay)
+        conn.close()
+
+    def write(self, conn, rows):
+        # True once the rows are committed
+        try:
+            with conn:
+                conn.executemany("INSERT INTO transactions (transaction_id, event, lane, created_at, total, "
+                                 "items, snapshot) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Error writing {len(rows)} transactions, will retry: {e}")
+            self.errors += 1
+            return False
+        self.written += len(rows)
+        self.batches += 1
+        return True
+
+    def history(self, transaction_id):
+        # Every event logged for one transaction, oldest first
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            rows = conn.execute("SELECT event, lane, created_at, total, items, snapshot FROM transactions "
+                                "WHERE transaction_id = ? ORDER BY seq", (transaction_id,)).fetchall()
+        finally:
+            conn.close()
+        return [{'event': event, 'lane': lane, 'created_at': created_at, 'total': total,
+                 'items': json.loads(items), 'snapshot': snapshot}
+                for event, lane, created_at, total, items, snapshot in rows]
+
+    def stats(self):
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'lost': self.lost,
+            'backlog': self.backlog.qsize()
+        }
+
+    def close(self):
+        # Write everything already queued, then stop the thread
+        self.backlog.put(None)
+        self.thread.join()